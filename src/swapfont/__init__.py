@@ -1 +1,6 @@
 # This file marks the directory as a Python package.
+
+try:
+    from ._version import __version__
+except ImportError:  # Source tree without a build; setuptools_scm writes _version
+    __version__ = "0+unknown"
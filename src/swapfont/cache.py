@@ -0,0 +1,100 @@
+# src/swapfont/cache.py
+"""
+On-disk cache for PDF inspection results.
+
+Inspection only depends on the bytes of the input PDF and on the swapfont
+version, so results are keyed by both and reused across runs (e.g. when
+re-running with a tweaked configuration). The directory is pruned to
+MAX_CACHE_BYTES, least recently used entries first.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional
+
+from . import __version__
+from .inspection.analyzer import inspect_pdf
+from .models import FontData
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Returns the directory used for cached inspection results."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "swapfont" / "inspect"
+
+
+def load_source_fonts(
+    input_path: Path, cache_dir: Optional[Path] = None, data: Optional[bytes] = None
+) -> Dict[str, FontData]:
+    """
+    Returns inspect_pdf(input_path), served from the on-disk cache when possible.
+    Pass `data` if the file contents are already in memory.
+    Cache read/write failures are logged and fall back to a fresh inspection.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    if data is None:
+        data = Path(input_path).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    cache_file = cache_dir / f"{digest}-{__version__}.pkl"
+
+    cached = _read_cache(cache_file)
+    if cached is not None:
+        logger.info("Using cached font inspection for %s", Path(input_path).name)
+        return cached
+
+    font_data_map = inspect_pdf(Path(input_path), data=data)
+    _write_cache(cache_file, font_data_map)
+    _prune_cache(cache_dir, MAX_CACHE_BYTES)
+    return font_data_map
+
+
+def _read_cache(cache_file: Path) -> Optional[Dict[str, FontData]]:
+    """Loads a cached result, or None on a miss or unreadable entry."""
+    if not cache_file.is_file():
+        return None
+    try:
+        with open(cache_file, "rb") as f:
+            result = pickle.load(f)
+        # Mark as recently used for _prune_cache
+        os.utime(cache_file)
+        return result
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError) as e:
+        logger.warning("Ignoring unreadable inspection cache %s: %s", cache_file, e)
+        return None
+
+
+def _write_cache(cache_file: Path, font_data_map: Dict[str, FontData]):
+    """Stores a result atomically so concurrent runs never see partial files."""
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            pickle.dump(font_data_map, f, protocol=5)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning("Could not write inspection cache %s: %s", cache_file, e)
+        tmp_file.unlink(missing_ok=True)
+
+
+def _prune_cache(cache_dir: Path, max_bytes: int):
+    """Deletes the least recently used entries until the cache fits max_bytes."""
+    try:
+        entries = sorted(
+            ((f.stat(), f) for f in cache_dir.glob("*.pkl")),
+            key=lambda item: item[0].st_mtime,
+        )
+        total = sum(st.st_size for st, _ in entries)
+        for st, entry in entries:
+            if total <= max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= st.st_size
+    except OSError as e:
+        logger.warning("Could not prune inspection cache %s: %s", cache_dir, e)
@@ -51,7 +51,28 @@ def main(debug):
 @click.argument("input_pdf", type=click.Path(exists=True, path_type=Path))
 @click.argument("config_json", type=click.Path(exists=True, path_type=Path))
 @click.option("--output", "-o", type=click.Path(path_type=Path), help="Output PDF path")
-def run_command(input_pdf, config_json, output):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes used to rewrite pages.",
+)
+@click.option(
+    "--cache",
+    "use_cache",
+    is_flag=True,
+    help="Reuse font metrics cached on disk from an earlier run on the same PDF.",
+)
+@click.option(
+    "--fast-save",
+    is_flag=True,
+    help="Write compressed object streams and leave unchanged streams undecoded.",
+)
+def run_command(
+    input_pdf, config_json, output, jobs, use_cache, fast_save
+):  # pylint: disable=too-many-arguments,too-many-positional-arguments
     """
     Execute a font replacement using a config file.
 
@@ -69,7 +90,14 @@ def run_command(input_pdf, config_json, output):
         logger.info("raw_config loaded")
         config = ReplacementConfig(**raw_config)
 
-        process_pdf(input_pdf, output, config)
+        process_pdf(
+            input_pdf,
+            output,
+            config,
+            jobs=jobs,
+            use_cache=use_cache,
+            fast_save=fast_save,
+        )
         logger.info("Done.")
 
     except Exception as e:
@@ -1,15 +1,19 @@
 # src/swapfont/core.py
+import io
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 import pikepdf
-from pdfbeaver import ProcessingOptions, modify_page
+from pdfbeaver import HandlerRegistry, ProcessingOptions, modify_page
 from pikepdf import Name
 
+from swapfont.cache import load_source_fonts
 from swapfont.engines.layout_engine import LayoutEngine
-from swapfont.font_embedding import embed_truetype_font
+from swapfont.font_embedding import WINANSI_UNICODES, embed_truetype_font
 from swapfont.font_utils import FontWrapper
 from swapfont.handlers import create_font_replacer_handler
 from swapfont.inspection.analyzer import inspect_pdf
@@ -18,6 +22,18 @@ from swapfont.tracker import FontedStateTracker
 
 logger = logging.getLogger(__name__)
 
+# Save settings for --fast-save: pack objects into compressed object streams,
+# skip linearization and copy unchanged streams without decoding them.
+FAST_SAVE_OPTIONS: Dict[str, Any] = {
+    "linearize": False,
+    "object_stream_mode": pikepdf.ObjectStreamMode.generate,
+    "compress_streams": True,
+    "stream_decode_level": pikepdf.StreamDecodeLevel.none,
+}
+
+# Bytes that may appear unescaped in a PDF name token
+_NAME_REGULAR_BYTES = frozenset(range(0x21, 0x7F)) - frozenset(b"()<>[]{}/%#")
+
 
 @dataclass
 class PipelineContext:
@@ -26,39 +42,89 @@ class PipelineContext:
     config: ReplacementConfig
     target_font_cache: Dict[str, Any]
     custom_encoding_maps: Dict[str, Any]
-    source_font_cache: Dict[str, Any]
+    source_type3_scales: Dict[str, float]
+
+
+@dataclass
+class PageRewriter:
+    """The layout engine, handler and options shared by every page of a run."""
+
+    layout_engine: LayoutEngine
+    handler: HandlerRegistry
+    options: ProcessingOptions
 
 
-def process_pdf(input_path: Path, output_path: Path, config: ReplacementConfig) -> None:
-    """Main entry point for processing a PDF."""
+def process_pdf(
+    input_path: Path,
+    output_path: Path,
+    config: ReplacementConfig,
+    jobs: int = 1,
+    use_cache: bool = False,
+    fast_save: bool = False,
+) -> None:
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    """
+    Main entry point for processing a PDF.
+
+    With jobs > 1, page content streams are rewritten in a pool of worker
+    processes and merged back into the document before saving.
+    With use_cache, source font inspection results are reused from the
+    on-disk cache (see swapfont.cache).
+    With fast_save, the output is written with FAST_SAVE_OPTIONS.
+    """
     logger.info("Processing %s -> %s", input_path, output_path)
 
+    # Read the input once; inspection, rewriting and workers all parse from memory
+    input_data = Path(input_path).read_bytes()
+
     # 1. Analyze Source Fonts
     # We must inspect the PDF to get metrics for the fonts we are replacing.
     logger.info("Analyzing source font metrics...")
     try:
-        source_font_cache = inspect_pdf(input_path)
+        if use_cache:
+            source_font_cache = load_source_fonts(input_path, data=input_data)
+        else:
+            source_font_cache = inspect_pdf(input_path, data=input_data)
     except (pikepdf.PdfError, ValueError) as e:
         # Catch only operational errors (malformed PDF, parse failure).
         # Logic errors must crash.
         logger.warning("Failed to inspect source PDF metrics: %s", e)
         source_font_cache = {}
 
-    # 2. Initialize Context
-    context = PipelineContext(
-        config=config,
-        target_font_cache={},
-        custom_encoding_maps={},
-        source_font_cache=source_font_cache,
-    )
+    # 2. Open PDF & Process
+    with pikepdf.open(io.BytesIO(input_data)) as pdf:
+        # Rules for fonts no page uses would only add dead embedded fonts
+        config = _drop_unused_rules(pdf, config)
 
-    # 3. Pre-load Metrics & Initialize Maps
-    for rule in config.rules:
+        context = PipelineContext(
+            config=config,
+            target_font_cache={},
+            custom_encoding_maps={},
+            source_type3_scales=_type3_scales(source_font_cache),
+        )
+        _preload_target_fonts(context)
+
+        embedded_objects = _embed_required_fonts(
+            pdf, config, context.target_font_cache, context.custom_encoding_maps
+        )
+
+        if jobs > 1 and len(pdf.pages) > 1:
+            _process_pages_parallel(pdf, input_data, context, embedded_objects, jobs)
+        else:
+            _process_pages_serial(pdf, context, embedded_objects)
+
+        pdf.save(output_path, **(FAST_SAVE_OPTIONS if fast_save else {}))
+        logger.info("Processing complete.")
+
+
+def _preload_target_fonts(context: PipelineContext) -> None:
+    """Loads target font metrics and collects the characters each font needs."""
+    for rule in context.config.rules:
         fname = rule.target_font_file
 
         if fname not in context.target_font_cache:
             try:
-                context.target_font_cache[fname] = FontWrapper(fname)
+                context.target_font_cache[fname] = FontWrapper.load(fname)
                 logger.debug("Loaded target font: %s", fname)
             except (OSError, ValueError) as e:
                 logger.error("Failed to load target font %s: %s", fname, e)
@@ -69,32 +135,216 @@ def process_pdf(input_path: Path, output_path: Path, config: ReplacementConfig)
 
         _register_required_characters(rule, context.custom_encoding_maps[fname])
 
-    # 4. Open PDF & Process
-    with pikepdf.open(input_path, allow_overwriting_input=True) as pdf:
 
-        embedded_objects = _embed_required_fonts(
-            pdf, config, context.target_font_cache, context.custom_encoding_maps
-        )
+def _type3_scales(source_fonts: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Type 3 design heights (em scale) of the inspected source fonts, by name.
+    Fonts that are not Type 3 or lack a design height are left out.
+    """
+    return {
+        name: float(data.type3_design_height)
+        for name, data in source_fonts.items()
+        if getattr(data, "is_type3", False)
+        and getattr(data, "type3_design_height", 0) > 0
+    }
+
+
+def _drop_unused_rules(
+    pdf: pikepdf.Pdf, config: ReplacementConfig
+) -> ReplacementConfig:
+    """Returns the config restricted to rules whose source font is referenced."""
+    used_fonts = _collect_font_resource_names(pdf)
+    rules_in_use = [
+        rule
+        for rule in config.rules
+        if rule.source_font_name.replace("/", "") in used_fonts
+    ]
+    if len(rules_in_use) == len(config.rules):
+        return config
+
+    logger.info(
+        "Skipping %d rule(s) for fonts not used in the document",
+        len(config.rules) - len(rules_in_use),
+    )
+    return config.model_copy(update={"rules": rules_in_use})
 
-        global_visited = set()
 
-        for i, page in enumerate(pdf.pages):
-            logger.debug("Processing page %d", i + 1)
-            source_pikepdf_fonts = _extract_page_fonts(page)
+def _collect_font_resource_names(pdf: pikepdf.Pdf) -> Set[str]:
+    """
+    Names (without the leading slash) of all font resources reachable from the
+    pages, including those of nested Form XObjects.
+    """
+    names: Set[str] = set()
+    visited: Set[Tuple[int, int]] = set()
+    pending = [getattr(page, "Resources", None) for page in pdf.pages]
 
-            try:
-                _process_single_page(
-                    pdf, page, context, source_pikepdf_fonts, global_visited
-                )
+    while pending:
+        resources = pending.pop()
+        if not isinstance(resources, pikepdf.Dictionary):
+            continue
 
-                _update_page_resources(page, config, embedded_objects)
+        fonts = resources.get("/Font")
+        if isinstance(fonts, pikepdf.Dictionary):
+            names.update(str(key).lstrip("/") for key in fonts)
 
-            except pikepdf.PdfError as e:
-                # Catch only PDF processing errors (e.g. malformed stream).
-                logger.error("Error processing page %d: %s", i + 1, e, exc_info=True)
+        xobjects = resources.get("/XObject")
+        if not isinstance(xobjects, pikepdf.Dictionary):
+            continue
+        for xobj in xobjects.as_dict().values():
+            if not isinstance(xobj, pikepdf.Stream) or xobj.objgen in visited:
+                continue
+            visited.add(xobj.objgen)
+            if xobj.get("/Subtype") == "/Form":
+                pending.append(xobj.get("/Resources"))
 
-        pdf.save(output_path)
-        logger.info("Processing complete.")
+    return names
+
+
+def _process_pages_serial(
+    pdf: pikepdf.Pdf,
+    ctx: PipelineContext,
+    embedded_objects: Dict[str, pikepdf.Object],
+) -> None:
+    """Rewrites every page in document order within the current process."""
+    rewriter = _create_page_rewriter(ctx, visited_streams=set())
+    font_resources = _target_font_resources(ctx.config, embedded_objects)
+
+    for _, page, ok in _rewrite_pages(pdf, range(len(pdf.pages)), rewriter):
+        if ok:
+            _add_font_resources(page, font_resources)
+
+
+def _process_pages_parallel(
+    pdf: pikepdf.Pdf,
+    input_data: bytes,
+    ctx: PipelineContext,
+    embedded_objects: Dict[str, pikepdf.Object],
+    jobs: int,
+) -> None:
+    """
+    Rewrites pages in worker processes, one contiguous page range per worker.
+
+    Each worker opens its own copy of the input, so results come back as raw
+    content bytes. Shared Form XObjects are taken from the earliest range that
+    touched them, which matches the serial order of first visit.
+    """
+    chunks = _split_page_range(len(pdf.pages), jobs)
+
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        futures = [
+            executor.submit(
+                _process_page_chunk,
+                input_data,
+                ctx.config,
+                ctx.custom_encoding_maps,
+                ctx.source_type3_scales,
+                chunk,
+            )
+            for chunk in chunks
+        ]
+        results = [future.result() for future in futures]
+
+    _apply_chunk_results(
+        pdf, results, _target_font_resources(ctx.config, embedded_objects)
+    )
+
+
+def _apply_chunk_results(
+    pdf: pikepdf.Pdf,
+    results: List[Tuple[Dict[int, Optional[bytes]], Dict[Tuple[int, int], bytes]]],
+    font_resources: Dict[str, pikepdf.Object],
+) -> None:
+    """Writes worker results back into `pdf`, in page-range order."""
+    written_xobjects: Set[Tuple[int, int]] = set()
+    for page_contents, xobject_contents in results:
+        for objgen, data in xobject_contents.items():
+            if objgen not in written_xobjects:
+                pdf.get_object(objgen).write(data)
+                written_xobjects.add(objgen)
+
+        for i, data in page_contents.items():
+            if data is None:
+                continue
+            page = pdf.pages[i]
+            page.Contents = pdf.make_stream(data)
+            _add_font_resources(page, font_resources)
+
+
+def _split_page_range(page_count: int, jobs: int) -> List[range]:
+    """Splits [0, page_count) into at most `jobs` contiguous, balanced ranges."""
+    jobs = max(1, min(jobs, page_count))
+    size, extra = divmod(page_count, jobs)
+    chunks = []
+    start = 0
+    for n in range(jobs):
+        stop = start + size + (1 if n < extra else 0)
+        chunks.append(range(start, stop))
+        start = stop
+    return chunks
+
+
+def _process_page_chunk(
+    input_data: bytes,
+    config: ReplacementConfig,
+    encoding_maps: Dict[str, Dict[str, int]],
+    source_type3_scales: Dict[str, float],
+    page_indices: range,
+) -> Tuple[Dict[int, Optional[bytes]], Dict[Tuple[int, int], bytes]]:
+    """
+    Worker entry point: rewrites a range of pages from a private copy of the input.
+
+    Returns the new content bytes per page index (None if the page failed) and
+    the rewritten data of every Form XObject visited along the way.
+    """
+    ctx = PipelineContext(
+        config=config,
+        target_font_cache={},
+        custom_encoding_maps=encoding_maps,
+        source_type3_scales=source_type3_scales,
+    )
+    _preload_target_fonts(ctx)
+
+    page_contents: Dict[int, Optional[bytes]] = {}
+    visited: Set[Tuple[int, int]] = set()
+    rewriter = _create_page_rewriter(ctx, visited)
+
+    with pikepdf.open(io.BytesIO(input_data)) as pdf:
+        for i, page, ok in _rewrite_pages(pdf, page_indices, rewriter):
+            page_contents[i] = page.Contents.read_bytes() if ok else None
+
+        return page_contents, _read_form_contents(pdf, visited)
+
+
+def _read_form_contents(
+    pdf: pikepdf.Pdf, objgens: Set[Tuple[int, int]]
+) -> Dict[Tuple[int, int], bytes]:
+    """Content bytes of the Form XObjects among `objgens`."""
+    contents = {}
+    for objgen in objgens:
+        xobj = pdf.get_object(objgen)
+        if isinstance(xobj, pikepdf.Stream) and xobj.get("/Subtype") == "/Form":
+            contents[objgen] = xobj.read_bytes()
+    return contents
+
+
+def _rewrite_pages(
+    pdf: pikepdf.Pdf, page_indices: range, rewriter: PageRewriter
+) -> Iterator[Tuple[int, pikepdf.Page, bool]]:
+    """
+    Runs the shared rewriter over a range of pages, yielding each page index,
+    page and whether it was rewritten. Failing pages are logged and skipped.
+    """
+    for i in page_indices:
+        logger.debug("Processing page %d", i + 1)
+        page = pdf.pages[i]
+        try:
+            _process_single_page(pdf, page, rewriter, _extract_page_fonts(page))
+        except pikepdf.PdfError as e:
+            # Catch only PDF processing errors (e.g. malformed stream).
+            logger.error("Error processing page %d: %s", i + 1, e, exc_info=True)
+            yield i, page, False
+        else:
+            yield i, page, True
 
 
 def _extract_page_fonts(page: pikepdf.Page) -> Dict[str, Any]:
@@ -107,24 +357,16 @@ def _extract_page_fonts(page: pikepdf.Page) -> Dict[str, Any]:
     return fonts
 
 
-def _process_single_page(
-    pdf: pikepdf.Pdf,
-    page: pikepdf.Page,
-    ctx: PipelineContext,
-    source_pikepdf_fonts: Dict[str, Any],
-    visited_streams: set,
-) -> None:
-    """Orchestrates the replacement pipeline using the high-level API."""
+def _create_page_rewriter(ctx: PipelineContext, visited_streams: set) -> PageRewriter:
+    """Builds the engine and handler once; pages rebind their fonts on it."""
     layout_engine = LayoutEngine(
         ctx.config,
         ctx.target_font_cache,
         ctx.custom_encoding_maps,
-        ctx.source_font_cache,
-        source_pikepdf_fonts,
+        ctx.source_type3_scales,
+        source_pikepdf_fonts={},
     )
 
-    handler = create_font_replacer_handler(layout_engine)
-
     options = ProcessingOptions(
         optimize=True,
         recurse_xobjects=True,
@@ -136,7 +378,20 @@ def _process_single_page(
         visited_streams=visited_streams,
     )
 
-    modify_page(pdf, page, handler, options)
+    return PageRewriter(
+        layout_engine, create_font_replacer_handler(layout_engine), options
+    )
+
+
+def _process_single_page(
+    pdf: pikepdf.Pdf,
+    page: pikepdf.Page,
+    rewriter: PageRewriter,
+    source_pikepdf_fonts: Dict[str, Any],
+) -> None:
+    """Orchestrates the replacement pipeline using the high-level API."""
+    rewriter.layout_engine.rebind_page_fonts(source_pikepdf_fonts)
+    modify_page(pdf, page, rewriter.handler, rewriter.options)
 
 
 def _register_required_characters(rule, font_encoding_map: Dict[str, int]):
@@ -164,22 +419,22 @@ def _embed_required_fonts(
         if fname not in embedded_objects:
             logger.info("Embedding font file %s", fname)
 
-            needed_chars = [c for c, slot in encoding_maps[fname].items()]
-            next_slot = 128
-            for char in sorted(needed_chars):
-                encoding_maps[fname][char] = next_slot
-                next_slot += 1
+            sorted_chars = sorted(encoding_maps[fname])
+            for offset, char in enumerate(sorted_chars):
+                encoding_maps[fname][char] = 128 + offset
 
             slot_map = {slot: char for char, slot in encoding_maps[fname].items()}
 
-            font_obj = embed_truetype_font(pdf, fname, slot_map)
+            font_obj = embed_truetype_font(
+                pdf, fname, slot_map, subset_unicodes=WINANSI_UNICODES
+            )
             embedded_objects[fname] = font_obj
 
-            if needed_chars:
+            if sorted_chars:
                 logger.info("Patching encoding for %s", fname)
                 _patch_font_encoding(
                     font_obj,
-                    needed_chars,
+                    sorted_chars,
                     encoding_maps[fname],
                     metrics_cache[fname],
                 )
@@ -187,41 +442,68 @@ def _embed_required_fonts(
     return embedded_objects
 
 
-def _update_page_resources(pike_page, config, embedded_objects):
-    """Adds the new font references to the page resources."""
-    if "/Resources" not in pike_page:
-        pike_page.Resources = pikepdf.Dictionary()
-
-    if "/Font" not in pike_page.Resources:
-        pike_page.Resources["/Font"] = pikepdf.Dictionary()
-
-    fonts_dict = pike_page.Resources["/Font"]
-
+def _target_font_resources(
+    config: ReplacementConfig, embedded_objects: Dict[str, pikepdf.Object]
+) -> Dict[str, pikepdf.Object]:
+    """Resource name -> embedded font object, computed once for all pages."""
+    font_resources = {}
     for rule in config.rules:
         if rule.target_font_file in embedded_objects:
             target_name = rule.target_font_name
             if not target_name.startswith("/"):
                 target_name = "/" + target_name
 
-            fonts_dict[target_name] = embedded_objects[rule.target_font_file]
+            font_resources[target_name] = embedded_objects[rule.target_font_file]
+    return font_resources
 
 
-def _patch_font_encoding(font_obj, needed_chars, encoding_map, metrics):
-    """Modifies the PDF font object to define a custom encoding."""
-    differences = []
-    for char in sorted(needed_chars):
-        glyph_name = metrics.cmap.get(ord(char))
-        if not glyph_name:
-            continue
-        slot = encoding_map[char]
-        differences.append(slot)
-        differences.append(Name("/" + glyph_name))
+def _add_font_resources(pike_page, font_resources: Dict[str, pikepdf.Object]):
+    """Adds precomputed font references to the page resources."""
+    if "/Resources" not in pike_page:
+        pike_page.Resources = pikepdf.Dictionary()
+
+    if "/Font" not in pike_page.Resources:
+        pike_page.Resources["/Font"] = pikepdf.Dictionary()
+
+    fonts_dict = pike_page.Resources["/Font"]
+    for target_name, font_obj in font_resources.items():
+        fonts_dict[target_name] = font_obj
+
+
+def _patch_font_encoding(font_obj, needed_chars_sorted, encoding_map, metrics):
+    """
+    Modifies the PDF font object to define a custom encoding.
+    needed_chars_sorted must already be in slot order.
+    """
+    cmap = metrics.cmap
+    pairs = [(encoding_map[char], cmap.get(ord(char))) for char in needed_chars_sorted]
+    # Serialize the array and let qpdf parse it in one call, rather than
+    # converting each slot and name to a pikepdf object separately.
+    tokens = b" ".join(
+        b"%d %s" % (slot, _glyph_name_token(glyph_name))
+        for slot, glyph_name in pairs
+        if glyph_name
+    )
+    differences = pikepdf.Object.parse(b"[" + tokens + b"]")
 
     encoding_dict = pikepdf.Dictionary(
         {
             "/Type": Name("/Encoding"),
             "/BaseEncoding": Name("/WinAnsiEncoding"),
-            "/Differences": pikepdf.Array(differences),
+            "/Differences": differences,
         }
     )
     font_obj["/Encoding"] = encoding_dict
+
+
+@lru_cache(maxsize=4096)
+def _glyph_name_token(glyph_name: str) -> bytes:
+    """
+    Returns the /GlyphName token for a glyph, escaping irregular bytes as #xx.
+    Cached since /Differences arrays repeat the same glyph names across fonts.
+    """
+    escaped = b"".join(
+        bytes([b]) if b in _NAME_REGULAR_BYTES else b"#%02X" % b
+        for b in glyph_name.encode("utf-8")
+    )
+    return b"/" + escaped
@@ -8,17 +8,122 @@ Responsible for:
 """
 
 import logging
-from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import pikepdf
 from pdfbeaver.utils.pdf_conversion import extract_string_bytes
 
 from ..font_utils import FontWrapper
-from ..models import ReplacementConfig, ReplacementRule
+from ..models import NUMERIC_OPERAND_TYPES, ReplacementConfig, ReplacementRule
 
 logger = logging.getLogger(__name__)
 
+# Most distinct strings whose target width is remembered per font state
+TARGET_WIDTH_MEMO_SIZE = 4096
+
+
+@dataclass
+class OperandWorkspace:
+    """
+    Text-show operands with every string decoded to bytes exactly once, so the
+    rewrite and both width calculations can share the result.
+
+    items: the Tj string, or the TJ array entries (numeric kerning values are
+           kept as-is, strings become bytes).
+    extra: trailing operands of the ' and " operators, passed through.
+    kinds: one flag per item, 1 for a string and 0 for a number, so consumers
+           branch on an int instead of repeating the type checks.
+    numeric_vals: float() of each numeric item, in order.
+    """
+
+    op: str
+    items: List[Any]
+    extra: List[Any] = field(default_factory=list)
+    kinds: Optional[bytearray] = None
+    numeric_vals: Optional[List[float]] = None
+
+    def __post_init__(self):
+        if self.kinds is None:
+            self.kinds = bytearray(isinstance(item, bytes) for item in self.items)
+        if self.numeric_vals is None:
+            self.numeric_vals = [
+                float(item) for item, kind in zip(self.items, self.kinds) if not kind
+            ]
+
+    @classmethod
+    def from_operands(cls, op: str, operands: List[Any]) -> "OperandWorkspace":
+        """Decodes raw handler operands."""
+        if op != "TJ":
+            return cls(
+                op,
+                [extract_string_bytes(operands[0])],
+                list(operands[1:]),
+                bytearray(b"\x01"),
+                [],
+            )
+
+        items = []
+        kinds = bytearray()
+        numeric_vals = []
+        for item in operands[0]:
+            if type(item) in NUMERIC_OPERAND_TYPES:
+                items.append(item)
+                kinds.append(0)
+                numeric_vals.append(float(item))
+            else:
+                items.append(extract_string_bytes(item))
+                kinds.append(1)
+        return cls(op, items, [], kinds, numeric_vals)
+
+    def with_items(
+        self, items: List[Any], numeric_vals: Optional[List[float]] = None
+    ) -> "OperandWorkspace":
+        """Returns a copy with replaced items of the same kinds."""
+        return OperandWorkspace(
+            self.op,
+            items,
+            list(self.extra),
+            self.kinds,
+            self.numeric_vals if numeric_vals is None else numeric_vals,
+        )
+
+    def scale_gaps(self, factor: float) -> "OperandWorkspace":
+        """Returns a copy with every numeric item multiplied by factor."""
+        scaled = [v * factor for v in self.numeric_vals]
+        values = iter(scaled)
+        items = [
+            item if kind else next(values) for item, kind in zip(self.items, self.kinds)
+        ]
+        return self.with_items(items, scaled)
+
+    def string_bytes(self) -> bytes:
+        """All string items concatenated, for a single vectorized width lookup."""
+        if len(self.items) == 1 and self.kinds[0]:
+            return self.items[0]
+        return b"".join(item for item, kind in zip(self.items, self.kinds) if kind)
+
+    def gap_sum(self) -> float:
+        """Sum of the numeric (kerning) items."""
+        return sum(self.numeric_vals)
+
+    def to_operands(self) -> List[Any]:
+        """Re-encodes the workspace as operands for the output stream."""
+        items = [
+            pikepdf.String(item) if kind else item
+            for item, kind in zip(self.items, self.kinds)
+        ]
+        if self.op == "TJ":
+            return [items]
+        return items + self.extra
+
+
+def _as_workspace(op: str, operands: Any) -> OperandWorkspace:
+    if isinstance(operands, OperandWorkspace):
+        return operands
+    return OperandWorkspace.from_operands(op, operands)
+
 
 class LayoutEngine:  # pylint: disable=too-many-instance-attributes
     """
@@ -30,17 +135,57 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
         config: ReplacementConfig,
         target_font_cache: Dict[str, FontWrapper],
         custom_encoding_maps: Dict[str, Dict[str, int]],
-        source_font_cache: Dict[str, Any],
+        source_type3_scales: Dict[str, float],
         source_pikepdf_fonts: Any,
     ):
         # pylint: disable=too-many-arguments, too-many-positional-arguments
         self.config = config
         self.target_font_cache = target_font_cache
         self.custom_encoding_maps = custom_encoding_maps
-        self.source_font_cache = source_font_cache
+        self.source_type3_scales = source_type3_scales
         self.source_pikepdf_fonts = source_pikepdf_fonts
 
-        # Active State
+        self._reset_active_state()
+
+        # Target width (pts) per byte value, filled lazily (NaN = not yet resolved).
+        # Valid only for the (wrapper, char map, font size) recorded in the key.
+        self._target_width_lut: Optional[np.ndarray] = None
+        self._target_width_key: Optional[Tuple[Any, Any, float]] = None
+
+        # String bytes -> target width (pts), valid alongside the table above.
+        # Tables, lists and headers repeat the same strings many times.
+        self._target_string_widths: Dict[bytes, float] = {}
+
+        # 256-byte Source Byte -> Target Slot table for bytes.translate().
+        # None if the active maps cannot be expressed as single-byte slots.
+        # Valid only for the (slot map, hex map) recorded in the key.
+        self._translate_table: Optional[bytes] = None
+        self._translate_key: Optional[Tuple[Any, Any]] = None
+
+        # Font key -> (source font object, metrics tuple from _build_source_metrics)
+        self._source_metrics_cache: Dict[str, Tuple[Any, Tuple]] = {}
+
+        # Tf font operand -> (str form, slash-less name, "/" + slash-less name).
+        # Keyed by value, as operands repeat a small set of resource names.
+        self._font_name_cache: Dict[Any, Tuple[str, str, str]] = {}
+
+        # Slash-less source font name -> first matching rule.
+        # Valid only for the rules list recorded in the key.
+        self._rules_by_source: Dict[str, ReplacementRule] = {}
+        self._rules_key: Optional[List[ReplacementRule]] = None
+
+        # id(rule) -> (rule, raw font map, slot map, char map, hex map).
+        # Entries are valid only while both the rule and the raw map are the
+        # same objects, so re-selecting a font skips rebuilding its maps.
+        self._encoding_maps_cache: Dict[int, Tuple[Any, ...]] = {}
+
+        # ((text matrix, CTM), result) of the last get_type3_matrix_ops call.
+        # Tm and the CTM usually stay fixed across many text-show operators.
+        self.type3_matrix_ops_memo: Optional[Tuple[Any, Any]] = None
+
+    def _reset_active_state(self):
+        """Clears the font selected by the last Tf operator."""
+        # pylint: disable=attribute-defined-outside-init
         self.current_pdf_font_name: Optional[str] = None
         self.active_rule: Optional[ReplacementRule] = None
         self.active_wrapper: Optional[FontWrapper] = None
@@ -58,24 +203,26 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
         # Track Type 3 scaling
         self.current_type3_scale_factor: float = 1.0
 
+    def rebind_page_fonts(self, source_pikepdf_fonts: Any):
+        """
+        Prepares the engine for the next page: swaps in that page's font
+        resources and clears the active font. Target-side lookup tables are
+        kept, since they do not depend on the page.
+        """
+        self.source_pikepdf_fonts = source_pikepdf_fonts
+        self._source_metrics_cache.clear()
+        self._reset_active_state()
+
     def set_active_font(self, font_name: str | pikepdf.Name, font_size: float):
         """Updates the engine with the current font context."""
-        font_name_str = str(font_name)
+        font_name_str, clean_name, slashed_name = self._normalize_font_name(font_name)
 
         self.current_pdf_font_name = font_name_str
         self.active_font_size = font_size
 
         # Find applicable rule
         # Note: We strip the leading slash for matching, following PDF convention
-        clean_name = font_name_str.replace("/", "")
-        self.active_rule = next(
-            (
-                r
-                for r in self.config.rules
-                if r.source_font_name.replace("/", "") == clean_name
-            ),
-            None,
-        )
+        self.active_rule = self._get_rules_by_source().get(clean_name)
 
         # Reset per-font state
         self.active_wrapper = None
@@ -89,18 +236,15 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
                 self.active_rule.target_font_file
             )
 
-            # Helper: Build all encoding maps (Slot, Char, Hex)
-            self._initialize_encoding_maps()
+            # Helper: Build all encoding maps (Slot, Char, Hex), once per rule
+            self._select_encoding_maps()
 
             # Handle Type 3 Scaling
-            source_data = self.source_font_cache.get(f"/{clean_name}")
-
-            if source_data and getattr(source_data, "is_type3", False):
-                scale = getattr(source_data, "type3_design_height", 0)
-                if scale > 0:
-                    self.current_type3_scale_factor = scale
-                    font_size = font_size * scale
-                    self.active_font_size = font_size
+            scale = self.source_type3_scales.get(slashed_name, 0.0)
+            if scale > 0:
+                self.current_type3_scale_factor = scale
+                font_size = font_size * scale
+                self.active_font_size = font_size
 
             # Apply User Override (fontsize_scaling_percentage)
             user_scale = self.active_rule.fontsize_scaling_percentage
@@ -112,6 +256,57 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
             font_name_to_return = self.active_rule.target_font_name.lstrip("/")
         return font_name_to_return, self.active_font_size
 
+    def _normalize_font_name(self, font_name: Any) -> Tuple[str, str, str]:
+        """Returns (str(font_name), name without slashes, "/" + that), memoized."""
+        try:
+            return self._font_name_cache[font_name]
+        except KeyError:
+            pass
+        except TypeError:  # unhashable operand, nothing to memoize
+            return self._split_font_name(font_name)
+
+        names = self._font_name_cache[font_name] = self._split_font_name(font_name)
+        return names
+
+    @staticmethod
+    def _split_font_name(font_name: Any) -> Tuple[str, str, str]:
+        font_name_str = str(font_name)
+        clean_name = font_name_str.replace("/", "")
+        return font_name_str, clean_name, f"/{clean_name}"
+
+    def _get_rules_by_source(self) -> Dict[str, ReplacementRule]:
+        """Returns the rule lookup table, rebuilding it if the rules list changed."""
+        if self._rules_key is not self.config.rules:
+            self._rules_by_source = {}
+            for rule in self.config.rules:
+                key = rule.source_font_name.replace("/", "")
+                self._rules_by_source.setdefault(key, rule)
+            self._rules_key = self.config.rules
+        return self._rules_by_source
+
+    def _select_encoding_maps(self):
+        """Activates the encoding maps of the active rule, building them on first use."""
+        rule = self.active_rule
+        raw_map = self.custom_encoding_maps.get(rule.target_font_file)
+
+        cached = self._encoding_maps_cache.get(id(rule))
+        if cached is not None and cached[0] is rule and cached[1] is raw_map:
+            (
+                self.active_target_slot_map,
+                self.active_target_char_map,
+                self.active_source_hex_map,
+            ) = cached[2:]
+            return
+
+        self._initialize_encoding_maps()
+        self._encoding_maps_cache[id(rule)] = (
+            rule,
+            raw_map,
+            self.active_target_slot_map,
+            self.active_target_char_map,
+            self.active_source_hex_map,
+        )
+
     def _initialize_encoding_maps(self):
         """
         Builds the three encoding maps used for replacement:
@@ -153,9 +348,11 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
 
     def _get_source_font_metrics(
         self,
-    ) -> Optional[Tuple[Any, int, int, List[float], float]]:
+    ) -> Optional[Tuple[np.ndarray, int, int, List[float], float]]:
         """
-        Extracts metrics (Widths, FirstChar, LastChar, FontMatrix, MissingWidth).
+        Extracts metrics (WidthTable, FirstChar, LastChar, FontMatrix, MissingWidth).
+        WidthTable is a 256-entry array of glyph widths indexed by byte value.
+        Results are cached per font key for as long as the font object is unchanged.
         """
         if not self.current_pdf_font_name:
             return None
@@ -170,6 +367,19 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
 
         font_obj = self.source_pikepdf_fonts[font_key]
 
+        cached = self._source_metrics_cache.get(font_key)
+        if cached is not None and cached[0] is font_obj:
+            return cached[1]
+
+        metrics = self._build_source_metrics(font_obj)
+        if metrics is not None:
+            self._source_metrics_cache[font_key] = (font_obj, metrics)
+        return metrics
+
+    def _build_source_metrics(
+        self, font_obj: Any
+    ) -> Optional[Tuple[np.ndarray, int, int, List[float], float]]:
+        """Reads the metrics tuple described in _get_source_font_metrics."""
         # Verify required fields
         if not (
             "/Widths" in font_obj
@@ -200,10 +410,23 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
                 except (ValueError, TypeError):
                     pass
 
-        return widths, first_char, last_char, font_matrix, missing_width
+        # Bytes outside [FirstChar, LastChar] or past the end of /Widths
+        # fall back to MissingWidth
+        width_table = np.full(256, missing_width, dtype=np.float64)
+        lo = max(first_char, 0)
+        hi = min(last_char, 255, first_char + len(widths) - 1)
+        if lo <= hi:
+            width_table[lo : hi + 1] = [
+                float(widths[code - first_char]) for code in range(lo, hi + 1)
+            ]
+
+        return width_table, first_char, last_char, font_matrix, missing_width
 
     def calculate_source_width_fallback(
-        self, op: str, operands: List[Any], source_state_dict: Dict[str, Any]
+        self,
+        op: str,
+        operands: Union[List[Any], OperandWorkspace],
+        source_state_dict: Dict[str, Any],
     ) -> float:
         # pylint: disable=too-many-arguments, too-many-positional-arguments
         """
@@ -217,48 +440,34 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
         if not metrics:
             return 0.0
 
-        items = operands[0] if op == "TJ" else [operands[0]]
-        glyph_width_sum, gap_sum, char_count = self._sum_source_widths(items, metrics)
+        workspace = _as_workspace(op, operands)
+        glyph_width_sum, gap_sum, char_count = self._sum_source_widths(
+            workspace, metrics
+        )
 
         # Pass metrics[3] (font_matrix) to finalize
         return self._finalize_source_width(
             glyph_width_sum, gap_sum, char_count, metrics[3], source_state_dict
         )
 
-    def _sum_source_widths(self, items, metrics) -> Tuple[float, float, int]:
-        """Calculates raw glyph widths and gaps from operand items."""
-        glyph_width_sum = 0.0
-        gap_sum = 0.0
-        char_count = 0
+    def _sum_source_widths(
+        self, workspace: OperandWorkspace, metrics
+    ) -> Tuple[float, float, int]:
+        """Calculates raw glyph widths and gaps from decoded operands."""
+        glyph_width_sum, char_count = self._compute_source_string_width(
+            workspace.string_bytes(), metrics
+        )
+        return glyph_width_sum, workspace.gap_sum(), char_count
 
-        for item in items:
-            if isinstance(item, (int, float, Decimal)):
-                gap_sum += float(item)
-            else:
-                w, count = self._compute_source_string_width(item, metrics)
-                glyph_width_sum += w
-                char_count += count
-
-        return glyph_width_sum, gap_sum, char_count
-
-    def _compute_source_string_width(self, item, metrics) -> Tuple[float, int]:
-        """Calculates the width sum of characters in a string item."""
-        widths, first_char, last_char, _, missing_width = metrics
-        s_bytes = extract_string_bytes(item)
-        width_sum = 0.0
-
-        for b in s_bytes:
-            if first_char <= b <= last_char:
-                idx = b - first_char
-                if 0 <= idx < len(widths):
-                    width_sum += float(widths[idx])
-                else:
-                    width_sum += missing_width
-            else:
-                # Use MissingWidth for out-of-range characters
-                width_sum += missing_width
+    def _compute_source_string_width(
+        self, s_bytes: bytes, metrics
+    ) -> Tuple[float, int]:
+        """Calculates the width sum of characters in a decoded string."""
+        if not s_bytes:
+            return 0.0, 0
 
-        return width_sum, len(s_bytes)
+        codes = np.frombuffer(s_bytes, dtype=np.uint8)
+        return float(metrics[0][codes].sum()), len(codes)
 
     def _finalize_source_width(
         self, glyph_width, gap_width, char_count, font_matrix, state
@@ -284,49 +493,83 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
 
         return final_width
 
-    def calculate_target_visual_width(self, op: str, operands: List[Any]) -> float:
+    def calculate_target_visual_width(
+        self, op: str, operands: Union[List[Any], OperandWorkspace]
+    ) -> float:
         """
         Calculates the visual width of the text using the target font metrics.
         """
         if not self.active_wrapper:
             return 1.0
 
-        items = operands[0] if op == "TJ" else [operands[0]]
-        total_width_pts = 0.0
-
-        for item in items:
-            total_width_pts += self._process_target_item(item)
-
-        return total_width_pts
+        # Every glyph width and gap scales with the font size
+        if self.active_font_size == 0.0:
+            return 0.0
 
-    def _process_target_item(self, item: Any) -> float:
-        """Calculates width contribution (pts) of a single target item (num or str)."""
-        if isinstance(item, (int, float, Decimal)):
-            return -(float(item) / 1000.0) * self.active_font_size
+        workspace = _as_workspace(op, operands)
+        return (
+            self._compute_target_string_width(workspace.string_bytes())
+            - (workspace.gap_sum() / 1000.0) * self.active_font_size
+        )
 
-        return self._compute_target_string_width(item)
+    def _compute_target_string_width(self, s_bytes: bytes) -> float:
+        """Calculates total width (pts) of a decoded string using target metrics."""
+        if not s_bytes:
+            return 0.0
 
-    def _compute_target_string_width(self, item: Any) -> float:
-        """Calculates total width (pts) of a string using target font metrics."""
-        s_bytes = extract_string_bytes(item)
-        width_pts = 0.0
+        lut = self._get_target_width_lut()
+        memo = self._target_string_widths
+        width = memo.get(s_bytes)
+        if width is not None:
+            return width
+
+        codes = np.frombuffer(s_bytes, dtype=np.uint8)
+        widths = lut[codes]
+
+        unresolved = np.isnan(widths)
+        if unresolved.any():
+            for b in np.unique(codes[unresolved]):
+                lut[b] = self._resolve_target_slot_width(int(b))
+            widths = lut[codes]
+
+        width = float(widths.sum())
+        if len(memo) >= TARGET_WIDTH_MEMO_SIZE:
+            memo.clear()
+        memo[s_bytes] = width
+        return width
+
+    def _get_target_width_lut(self) -> np.ndarray:
+        """Returns the per-byte width table, discarding it if the font state changed."""
+        key = self._target_width_key
+        if (
+            self._target_width_lut is None
+            or key[0] is not self.active_wrapper
+            or key[1] is not self.active_target_char_map
+            or key[2] != self.active_font_size
+        ):
+            self._target_width_lut = np.full(256, np.nan, dtype=np.float64)
+            self._target_string_widths.clear()
+            self._target_width_key = (
+                self.active_wrapper,
+                self.active_target_char_map,
+                self.active_font_size,
+            )
+        return self._target_width_lut
 
-        for b in s_bytes:
-            target_char = self._map_target_byte_to_char(b)
+    def _resolve_target_slot_width(self, b: int) -> float:
+        """Calculates the width (pts) of a single target byte."""
+        target_char = self._map_target_byte_to_char(b)
 
-            if not target_char:
-                # Only fallback to ASCII range. High-bit chars (128-255)
-                # are risky to map via chr() as they depend on the font's encoding.
-                target_char = chr(b) if 32 <= b <= 126 else None
+        if not target_char:
+            # Only fallback to ASCII range. High-bit chars (128-255)
+            # are risky to map via chr() as they depend on the font's encoding.
+            target_char = chr(b) if 32 <= b <= 126 else None
 
-            if target_char:
-                try:
-                    w_norm = self.active_wrapper.get_char_width(target_char)
-                    width_pts += (w_norm / 1000.0) * self.active_font_size
-                except ValueError as exc:
-                    raise exc
+        if not target_char:
+            return 0.0
 
-        return width_pts
+        w_norm = self.active_wrapper.get_char_width(target_char)
+        return (w_norm / 1000.0) * self.active_font_size
 
     def rewrite_text_operands(self, op: str, operands: List[Any]) -> List[Any]:
         """
@@ -335,30 +578,31 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
         if not self.active_rule or not self.active_target_slot_map:
             return operands
 
-        new_operands = []
+        return self.rewrite_workspace(
+            OperandWorkspace.from_operands(op, operands)
+        ).to_operands()
+
+    def rewrite_workspace(self, workspace: OperandWorkspace) -> OperandWorkspace:
+        """
+        Returns a new workspace whose strings are mapped to target slots.
+        The workspace is returned unchanged if no mapping is active.
+        """
+        if not self.active_rule or not self.active_target_slot_map:
+            return workspace
+
+        return workspace.with_items(
+            [
+                self._rewrite_bytes(item) if kind else item
+                for item, kind in zip(workspace.items, workspace.kinds)
+            ]
+        )
+
+    def _rewrite_bytes(self, source_bytes: bytes) -> bytes:
+        """Maps decoded source bytes to target slots."""
+        table = self._get_translate_table()
+        if table is not None:
+            return bytes(source_bytes).translate(table)
 
-        # Handle TJ vs Tj
-        if op == "TJ":
-            source_array = operands[0]
-            new_array = []
-            for item in source_array:
-                if isinstance(item, (int, float, Decimal)):
-                    new_array.append(item)
-                else:
-                    new_array.append(self._rewrite_string(item))
-            new_operands.append(new_array)
-        else:
-            # Tj, ', "
-            new_operands.append(self._rewrite_string(operands[0]))
-            # Append other operands if any (Tj only has 1, ' has 1, " has 3)
-            if len(operands) > 1:
-                new_operands.extend(operands[1:])
-
-        return new_operands
-
-    def _rewrite_string(self, item: Any) -> pikepdf.String:
-        """Rewrites a single string item."""
-        source_bytes = extract_string_bytes(item)
         target_bytes = bytearray()
 
         for b in source_bytes:
@@ -371,8 +615,38 @@ class LayoutEngine:  # pylint: disable=too-many-instance-attributes
                 # Keeping original risks garbage if font doesn't match
                 target_bytes.append(b)
 
-        ret = pikepdf.String(bytes(target_bytes))
-        return ret
+        return bytes(target_bytes)
+
+    def _get_translate_table(self) -> Optional[bytes]:
+        """Returns the byte translation table, rebuilding it if the maps changed."""
+        key = self._translate_key
+        if (
+            key is None
+            or key[0] is not self.active_target_slot_map
+            or key[1] is not self.active_source_hex_map
+        ):
+            self._translate_table = self._build_translate_table()
+            self._translate_key = (
+                self.active_target_slot_map,
+                self.active_source_hex_map,
+            )
+        return self._translate_table
+
+    def _build_translate_table(self) -> Optional[bytes]:
+        """
+        Resolves _map_source_byte for all 256 byte values at once.
+        Returns None if any slot is not a single byte, so that the per-byte
+        path reports it exactly as before.
+        """
+        table = bytearray(range(256))
+        for b in range(256):
+            target_slot, _ = self._map_source_byte(b)
+            if target_slot is None:
+                continue
+            if not isinstance(target_slot, int) or not 0 <= target_slot <= 255:
+                return None
+            table[b] = target_slot
+        return bytes(table)
 
     def _map_source_byte(self, b: int) -> Tuple[Optional[int], int]:
         """
@@ -1,12 +1,19 @@
 # src/swapfont/font_embedding.py
 """Font embedding"""
 
+import hashlib
+import io
 import logging
+import mmap
+import os
+import string
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 
+import numpy as np
 import pikepdf
+from fontTools.subset import Options, Subsetter
 from fontTools.ttLib import TTFont, TTLibError
 
 logger = logging.getLogger(__name__)
@@ -27,10 +34,18 @@ class FontMetricsData:  # pylint: disable=too-many-instance-attributes
     units_per_em: int = 1000
 
 
+# Every character reachable through /WinAnsiEncoding (the base encoding of the
+# embedded font), plus the Latin-1 code points the widths heuristic looks up.
+WINANSI_UNICODES = frozenset(
+    ord(c) for c in bytes(range(32, 256)).decode("cp1252", errors="ignore")
+) | frozenset(range(160, 256))
+
+
 def embed_truetype_font(
     pdf: pikepdf.Pdf,
     font_path: str,
     custom_encoding_map: Optional[Dict[int, str]] = None,
+    subset_unicodes: Optional[Iterable[int]] = None,
 ) -> pikepdf.Object:
     """
     Embeds a TrueType font into the PDF document and returns the Font Object.
@@ -44,6 +59,9 @@ def embed_truetype_font(
         custom_encoding_map: Optional dict mapping {slot_index: unicode_char}.
                              Used to insert correct widths for remapped slots
                              (e.g. {128: 'fi', 129: 'Pi'}).
+        subset_unicodes: Optional code points to keep. If given, the embedded
+                         font program is subset to these glyphs (plus those of
+                         custom_encoding_map) and the name gets a subset tag.
 
     Returns:
         A pikepdf.Object representing the /Font dictionary.
@@ -52,22 +70,35 @@ def embed_truetype_font(
     if not path.exists():
         raise FileNotFoundError(f"Font file not found: {font_path}")
 
-    try:
-        tt = TTFont(path)
-    except TTLibError as e:
-        logger.error("Could not parse font %s: %s", font_path, e)
-        raise
-
-    # 1. Extract Metrics from TTF Tables
-    metrics = _extract_ttf_metrics(tt)
-
-    # 2. Create the Widths Array
-    # Pass custom mapping so we generate correct widths for overridden slots
-    widths = _widths_array(tt, metrics, custom_encoding_map)
-
-    # 3. Create FontFile2 Stream (The binary font data)
-    with open(path, "rb") as f:
-        font_data = f.read()
+    # Map the file rather than reading it: fontTools pulls in only the tables
+    # it needs, and the whole program is copied out only if embedded as-is.
+    with open(path, "rb") as f, _map_font_file(f, font_path) as font_map:
+        try:
+            tt = TTFont(font_map)
+        except TTLibError as e:
+            logger.error("Could not parse font %s: %s", font_path, e)
+            raise
+
+        # 1. Extract Metrics from TTF Tables
+        metrics = _extract_ttf_metrics(tt)
+
+        # 2. Create the Widths Array
+        # Pass custom mapping so we generate correct widths for overridden slots
+        widths = _widths_array(tt, metrics, custom_encoding_map)
+
+        # 3. Create FontFile2 Stream (The binary font data)
+        font_data = None
+        ps_name = metrics.ps_name
+        if subset_unicodes is not None:
+            unicodes = set(subset_unicodes)
+            for char_str in (custom_encoding_map or {}).values():
+                unicodes.update(ord(c) for c in char_str)
+            font_data = _subset_font_data(tt, unicodes, font_path)
+            if font_data is not None:
+                ps_name = f"{_subset_tag(unicodes)}+{ps_name}"
+
+        if font_data is None:
+            font_data = font_map[:]
 
     font_stream = pdf.make_stream(font_data)
     font_stream.Length1 = len(font_data)
@@ -77,9 +108,9 @@ def embed_truetype_font(
         pikepdf.Dictionary(
             {
                 "/Type": pikepdf.Name("/FontDescriptor"),
-                "/FontName": pikepdf.Name(f"/{metrics.ps_name}"),
+                "/FontName": pikepdf.Name(f"/{ps_name}"),
                 "/Flags": metrics.flags,
-                "/FontBBox": [float(x) for x in metrics.bbox],
+                "/FontBBox": _pdf_real_array(metrics.bbox),
                 "/ItalicAngle": float(metrics.italic_angle),
                 "/Ascent": float(metrics.ascent),
                 "/Descent": float(metrics.descent),
@@ -96,20 +127,60 @@ def embed_truetype_font(
             {
                 "/Type": pikepdf.Name("/Font"),
                 "/Subtype": pikepdf.Name("/TrueType"),
-                "/BaseFont": pikepdf.Name(f"/{metrics.ps_name}"),
+                "/BaseFont": pikepdf.Name(f"/{ps_name}"),
                 "/FirstChar": 0,
                 "/LastChar": 255,
-                "/Widths": widths,
+                "/Widths": _pdf_real_array(widths),
                 "/Encoding": pikepdf.Name("/WinAnsiEncoding"),
                 "/FontDescriptor": font_descriptor,
             }
         )
     )
 
-    logger.info("Embedded TrueType font: %s as %s", path.name, metrics.ps_name)
+    logger.info("Embedded TrueType font: %s as %s", path.name, ps_name)
     return font_obj
 
 
+def _map_font_file(f, font_path) -> mmap.mmap:
+    """Read-only memory map of an open font file."""
+    if os.fstat(f.fileno()).st_size == 0:
+        # mmap cannot map empty files; report it the way fontTools would
+        logger.error("Could not parse font %s: empty file", font_path)
+        raise TTLibError("Not a TrueType or OpenType font (not enough data)")
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _subset_font_data(tt, unicodes, font_path) -> Optional[bytes]:
+    """
+    Subsets tt in place to the glyphs of `unicodes` and returns the new font
+    program, or None (embed the full file) if fontTools cannot subset it.
+    Glyph names are kept because /Differences refers to glyphs by name.
+    """
+    options = Options()
+    options.notdef_outline = True
+    options.glyph_names = True
+    options.name_IDs = ["*"]
+    options.name_languages = ["*"]
+
+    try:
+        subsetter = Subsetter(options=options)
+        subsetter.populate(unicodes=unicodes)
+        subsetter.subset(tt)
+        buffer = io.BytesIO()
+        tt.save(buffer)
+    except (TTLibError, KeyError, AssertionError) as e:
+        logger.warning("Could not subset %s, embedding full font: %s", font_path, e)
+        return None
+
+    return buffer.getvalue()
+
+
+def _subset_tag(unicodes) -> str:
+    """Six uppercase letters derived from the glyph set, as PDF subset names need."""
+    digest = hashlib.sha256(",".join(map(str, sorted(unicodes))).encode()).digest()
+    return "".join(string.ascii_uppercase[b % 26] for b in digest[:6])
+
+
 def _extract_ttf_metrics(tt):
     head = tt["head"]
     hhea = tt["hhea"]
@@ -156,66 +227,71 @@ def _extract_ttf_metrics(tt):
     )
 
 
-def _get_glyph_width(tt, metrics, gname):
-    """Safely looks up glyph width from hmtx table."""
-    if gname and gname in tt["hmtx"].metrics:
-        return tt["hmtx"][gname][0] * metrics.scale
-    return 0.0
+def _pdf_real_array(values: Iterable[float]) -> pikepdf.Array:
+    """
+    Builds a PDF array of numbers by parsing their text form. pikepdf converts
+    each Python float through Decimal, which costs several microseconds per
+    element; formatting to the 6 decimal places pikepdf keeps gives the same
+    array an order of magnitude faster.
+    """
+    text = " ".join(f"{x:.6f}".rstrip("0").rstrip(".") for x in values)
+    return pikepdf.Object.parse(f"[{text}]".encode("ascii"))
 
 
-def _calculate_slot_width(
-    i: int,
-    custom_map: Optional[Dict[int, str]],
-    cmap,
-    tt,
-    metrics,
-    default_width: float,
-) -> float:
-    # pylint: disable=too-many-arguments, too-many-positional-arguments
-    """Calculates the width for a specific character slot (0-255)."""
-    width = 0.0
-
-    # 1. Check for Custom Mapping Override
-    if custom_map and i in custom_map:
-        char_str = custom_map[i]
-        # Look up glyph name for this custom char
-        if len(char_str) == 1:
-            gname = cmap.get(ord(char_str))
-            if gname:
-                width = _get_glyph_width(tt, metrics, gname)
-            else:
-                logger.warning(
-                    "Custom char '%s' (slot %s) not found in font cmap.",
-                    char_str,
-                    i,
-                )
-                width = default_width
-        else:
-            # Fallback for complex mappings
-            width = default_width
+def _get_glyph_width(hmtx_metrics, scale, gname):
+    """Safely looks up glyph width in the hmtx metrics dict."""
+    entry = hmtx_metrics.get(gname) if gname else None
+    if entry:
+        return entry[0] * scale
+    return 0.0
 
-    # 2. Standard Lookup (if no override found or width still 0)
-    if width == 0.0:
-        # Heuristic: look up unicode code point directly for ASCII
-        gname = cmap.get(i)
-        if gname:
-            width = _get_glyph_width(tt, metrics, gname)
-        else:
-            width = default_width
 
-    return width
+def _slot_glyph_names(cmap) -> List[Optional[str]]:
+    """Glyph names for the 256 single-byte code points (None where unmapped)."""
+    lookup = cmap.get
+    return [lookup(code_point) for code_point in range(256)]
 
 
 def _widths_array(tt, metrics, custom_map: Optional[Dict[int, str]] = None):
     """
     Return the widths array for a Simple Font (0..255).
+
+    Slot i takes the width of the glyph for code point i; slots listed in
+    custom_map take the width of their mapped character instead. Raw advances
+    are collected in one pass and scaled as a single array.
     """
-    widths = []
     cmap = tt.getBestCmap()
-    default_width = _get_glyph_width(tt, metrics, ".notdef") or 600.0
-
-    for i in range(0, 256):
-        width = _calculate_slot_width(i, custom_map, cmap, tt, metrics, default_width)
-        widths.append(width)
+    hmtx_metrics = tt["hmtx"].metrics
+    default_width = _get_glyph_width(hmtx_metrics, metrics.scale, ".notdef") or 600.0
+
+    def raw_advance(gname: Optional[str]) -> float:
+        """Advance in font units; 0.0 if the glyph lacks metrics, NaN if unmapped."""
+        if not gname:
+            return np.nan
+        entry = hmtx_metrics.get(gname)
+        return entry[0] if entry else 0.0
+
+    widths = np.array(
+        [raw_advance(g) for g in _slot_glyph_names(cmap)], dtype=np.float64
+    )
+    widths *= metrics.scale
+    widths[np.isnan(widths)] = default_width
 
-    return widths
+    for slot, char_str in (custom_map or {}).items():
+        if not 0 <= slot < 256:
+            continue
+        if len(char_str) != 1:
+            # Fallback for complex mappings
+            widths[slot] = default_width
+            continue
+        advance = raw_advance(cmap.get(ord(char_str)))
+        if np.isnan(advance):
+            logger.warning(
+                "Custom char '%s' (slot %s) not found in font cmap.", char_str, slot
+            )
+            widths[slot] = default_width
+        elif advance:
+            # A zero-width custom glyph keeps the standard width of the slot
+            widths[slot] = advance * metrics.scale
+
+    return widths.tolist()
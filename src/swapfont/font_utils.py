@@ -1,6 +1,9 @@
 # src/swapfont/font_utils.py
 """Font utilities"""
 import logging
+import os
+from functools import lru_cache
+from typing import Dict
 
 from fontTools.ttLib import TTFont
 
@@ -12,6 +15,9 @@ class FontWrapper:
     Wrapper around fontTools.TTFont to provide simplified metric lookups.
     """
 
+    # True for wrappers handed out by load(); those outlive any one caller
+    _shared = False
+
     def __init__(self, font_path: str):
         self.path = font_path
         self.ttfont = TTFont(font_path)
@@ -23,6 +29,18 @@ class FontWrapper:
         # Spec guarantees GID 0 exists, but doesn't guarantee it's named ".notdef"
         self.fallback_glyph_name = self.ttfont.getGlyphOrder()[0]
 
+        # Char -> width in PDF units, filled on first lookup of each char
+        self._width_cache: Dict[str, float] = {}
+
+    @classmethod
+    def load(cls, font_path: str) -> "FontWrapper":
+        """
+        Returns a shared wrapper for font_path, parsing the file only once per
+        process. The file is re-read if its size or modification time changes.
+        """
+        stat = os.stat(font_path)
+        return _load_shared_wrapper(font_path, stat.st_mtime_ns, stat.st_size)
+
     @property
     def units_per_em(self) -> int:
         """Returns the unitsPerEm value from the head table."""
@@ -42,6 +60,13 @@ class FontWrapper:
         """
         Returns the width of a unicode character in PDF units (1/1000th of font size).
         """
+        width = self._width_cache.get(char)
+        if width is None:
+            width = self._width_cache[char] = self._lookup_char_width(char)
+        return width
+
+    def _lookup_char_width(self, char: str) -> float:
+        """Resolves a char's width through cmap and hmtx (uncached)."""
         if not char:
             return 0.0
 
@@ -71,5 +96,17 @@ class FontWrapper:
             return 600.0  # Safe default width
 
     def close(self):
-        """Closes the underlying TTFont resource."""
+        """
+        Closes the underlying TTFont resource. Does nothing for wrappers
+        returned by load(), since other callers may still be using them.
+        """
+        if self._shared:
+            return
         self.ttfont.close()
+
+
+@lru_cache(maxsize=32)
+def _load_shared_wrapper(font_path: str, _mtime_ns: int, _size: int) -> FontWrapper:
+    wrapper = FontWrapper(font_path)
+    wrapper._shared = True  # pylint: disable=protected-access
+    return wrapper
@@ -1,9 +1,8 @@
 # src/swapfont/handlers.py
 import logging
-from decimal import Decimal
+import math
 from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
-import numpy as np
 import pikepdf
 from pdfbeaver import (
     HandlerRegistry,
@@ -14,16 +13,21 @@ from pdfbeaver import (
 )
 from pikepdf import Operator
 
+from .engines.layout_engine import OperandWorkspace
+
 if TYPE_CHECKING:
     from .engines.layout_engine import LayoutEngine
 
 logger = logging.getLogger(__name__)
 
+# Text-space origin used when no pre-operator state is available
+_ORIGIN = (0.0, 0.0, 1.0)
+
 # --- Testable Helper Functions (Module Level) ---
 
 
-def scale_tj_array(active_operands, input_state, layout_engine):
-    """Rescales values in a TJ array based on font size differences."""
+def tj_gap_scale(input_state, layout_engine) -> float:
+    """Returns the factor converting TJ kerning values to the target font size."""
     source_fs = 1.0
     if input_state and input_state.get("tstate"):
         source_fs = getattr(input_state["tstate"], "fontsize", 1.0)
@@ -31,15 +35,7 @@ def scale_tj_array(active_operands, input_state, layout_engine):
     target_fs = layout_engine.active_font_size
     if target_fs < 1e-3:
         target_fs = 1.0
-    gap_scale = source_fs / target_fs
-
-    new_array = []
-    for item in active_operands[0]:
-        if isinstance(item, (int, float, Decimal)):
-            new_array.append(float(item) * gap_scale)
-        else:
-            new_array.append(item)
-    active_operands[0] = pikepdf.Array(new_array)
+    return source_fs / target_fs
 
 
 def calculate_scale_percent(
@@ -55,8 +51,14 @@ def calculate_scale_percent(
     - The layout engine (target font metrics)
     """
     target_width = layout_engine.calculate_target_visual_width(op, active_operands)
+    if target_width <= 1e-3:
+        # Nothing visible to fit (e.g. zero font size): skip measuring the source
+        return 100.0
+
     input_end_pos = extract_text_position(input_state)
-    input_width = np.linalg.norm(input_end_pos[:2] - start_pos[:2])
+    input_width = math.hypot(
+        input_end_pos[0] - start_pos[0], input_end_pos[1] - start_pos[1]
+    )
 
     if input_width < 0.001:
         input_width = layout_engine.calculate_source_width_fallback(
@@ -113,14 +115,27 @@ def get_type3_matrix_ops(
     if not is_t3:
         return False, {}
 
+    current_tm = output_state.textstate.matrix
+    memo_key = (tuple(current_tm), tuple(output_state.gstate.ctm))
+    memo = getattr(layout_engine, "type3_matrix_ops_memo", None)
+    if memo is not None and memo[0] == memo_key:
+        return memo[1]
+
+    result = _compute_type3_matrix_ops(output_state, current_tm)
+    layout_engine.type3_matrix_ops_memo = (memo_key, result)
+    return result
+
+
+def _compute_type3_matrix_ops(
+    output_state: Any, current_tm: Any
+) -> Tuple[bool, Dict[str, Tuple]]:
+    """Builds the Tm operators that un-flip a mirrored Type 3 text matrix."""
     # 1. DETECT visual flip using the Text Rendering Matrix (TRM = Tm x CTM)
     _, trm = output_state.get_matrices()
     if trm[1, 1] >= 0:
         return False, {}
 
     # 2. FIX the flip using the Text Matrix (Tm) directly.
-    current_tm = output_state.textstate.matrix
-
     apply_vals = list(current_tm)
     apply_vals[3] = abs(apply_vals[3])
 
@@ -239,17 +254,25 @@ def create_font_replacer_handler(layout_engine: "LayoutEngine") -> HandlerRegist
         if not layout_engine.active_rule:
             return registry.PASS_THROUGH
 
-        start_pos = np.array([0.0, 0.0, 1.0])
+        start_pos = _ORIGIN
         if context.pre_input:
             start_pos = extract_text_position(context.pre_input)
 
-        active_operands = layout_engine.rewrite_text_operands(op, operands)
+        # Decode each string operand once; the rewrite and both width
+        # calculations work on the same bytes.
+        source_ws = OperandWorkspace.from_operands(op, operands)
+        target_ws = layout_engine.rewrite_workspace(source_ws)
+
+        if op == "TJ":
+            gap_scale = tj_gap_scale(context.post_input, layout_engine)
+            target_ws = target_ws.scale_gaps(gap_scale)
 
+        active_operands = target_ws.to_operands()
         if op == "TJ":
-            scale_tj_array(active_operands, context.post_input, layout_engine)
+            active_operands[0] = pikepdf.Array(active_operands[0])
 
         scale_percent = calculate_scale_percent(
-            op, active_operands, operands, context.post_input, start_pos, layout_engine
+            op, target_ws, source_ws, context.post_input, start_pos, layout_engine
         )
 
         return generate_text_ops(
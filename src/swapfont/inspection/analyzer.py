@@ -2,9 +2,9 @@
 """PDF font inspector logic"""
 
 import argparse
+import io
 import json
 import logging
-from decimal import Decimal
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -12,7 +12,7 @@ import pikepdf
 from pikepdf import Array
 
 # Import the core FontData model and constants from the separate models module
-from ..models import TEXT_SHOWING_OPERATORS, FontData
+from ..models import NUMERIC_OPERAND_TYPES, TEXT_SHOWING_OPERATORS, FontData
 
 # Import the new diagnostic generation function
 from .diagnostic import generate_diagnostic_pdf
@@ -20,6 +20,11 @@ from .diagnostic import generate_diagnostic_pdf
 # Logger is set up later in main_inspector
 logger = logging.getLogger(__name__)
 
+# Nesting level of the per-character entries in a config template
+# (document > rules > rule > characters_used > entry). Each entry is
+# written on one line instead of being indented field by field.
+_TEMPLATE_INDENT_DEPTH = 4
+
 # --- Inspection Logic ---
 
 
@@ -28,9 +33,11 @@ def scan_for_text_content(pdf: pikepdf.Pdf, font_data_map: Dict[str, FontData]):
     Scans all text-showing operators (Tj, TJ, ', ") across all pages
     to populate the set of used character codes for each font.
     """
+    debug = logger.isEnabledFor(logging.DEBUG)
     for i, page in enumerate(pdf.pages):
         page_num = i + 1
-        logger.debug("Scanning page %d", page_num)
+        if debug:
+            logger.debug("Scanning page %d", page_num)
 
         try:
             _scan_page_for_text_content(page, font_data_map, page_num)
@@ -39,9 +46,13 @@ def scan_for_text_content(pdf: pikepdf.Pdf, font_data_map: Dict[str, FontData]):
 
 
 def _scan_page_for_text_content(
-    page: pikepdf.Page, font_data_map: Dict[str, FontData], page_num: int
+    page: pikepdf.Page,
+    font_data_map: Dict[str, FontData],
+    page_num: int,
+    fonts: Optional[Any] = None,
 ):
-    fonts = page.Resources.get("/Font", {})
+    if fonts is None:
+        fonts = page.Resources.get("/Font", {})
     if not fonts:
         return
 
@@ -57,6 +68,30 @@ def _scan_page_for_text_content(
             _handle_text_operator(operands, font_data_map, active_font_name, page_num)
 
 
+def _inspect_pages(pdf: pikepdf.Pdf) -> Dict[str, FontData]:
+    """
+    Collects font resources and scans text usage in a single pass over
+    the pages, reading each page's /Font dictionary once.
+    """
+    font_data_map: Dict[str, FontData] = {}
+
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for i, page in enumerate(pdf.pages):
+        page_num = i + 1
+        if debug:
+            logger.debug("Scanning page %d", page_num)
+
+        fonts = page.Resources.get("/Font", {})
+        _collect_fonts_from_page(font_data_map, fonts)
+
+        try:
+            _scan_page_for_text_content(page, font_data_map, page_num, fonts)
+        except (pikepdf.PdfError, ValueError, TypeError) as e:
+            logger.error("Failed to process content stream on page %d: %s", page_num, e)
+
+    return font_data_map
+
+
 def _handle_font_operator(
     operands: List[Any], font_data_map: Dict[str, FontData]
 ) -> Optional[str]:
@@ -94,11 +129,15 @@ def _handle_text_operator(
 
 def _process_text_token(token: Any, font_data: FontData, page_num: int):
     """Convert token to bytes and update font data structures."""
-    if isinstance(token, (int, float, Decimal)):
+    if type(token) in NUMERIC_OPERAND_TYPES:
         return  # skip kerning values
 
     try:
-        source_bytes = str(token).encode("latin1")
+        if isinstance(token, pikepdf.String):
+            # Raw string bytes are the character codes; no decode round trip
+            source_bytes = bytes(token)
+        else:
+            source_bytes = str(token).encode("latin1")
     except ValueError as exc:
         logger.debug(
             "Could not convert token to string in %s stream: %r (Type: %s) - %s",
@@ -109,58 +148,53 @@ def _process_text_token(token: Any, font_data: FontData, page_num: int):
         )
         return
 
-    for byte_val in source_bytes:
-        code = int(byte_val)
-        if code not in font_data.used_char_codes:
-            font_data.used_char_codes[code] = font_data.get_width(code)
-        font_data.char_pages[code].add(page_num)
+    # Each distinct code needs one update, however often it repeats
+    codes = set(source_bytes)
+    used_char_codes = font_data.used_char_codes
+    for code in codes.difference(used_char_codes):
+        used_char_codes[code] = font_data.get_width(code)
 
+    char_pages = font_data.char_pages
+    for code in codes:
+        char_pages[code].add(page_num)
 
-def inspect_pdf(input_path: Path) -> Dict[str, FontData]:
+
+def inspect_pdf(input_path: Path, data: Optional[bytes] = None) -> Dict[str, FontData]:
     """
     Main inspection function: opens PDF, extracts font resources, and scans content.
+    If `data` holds the file contents already read into memory, it is parsed
+    instead of re-reading `input_path` from disk.
     """
     logger.info("Starting inspection of %s", input_path.name)
 
-    # 1. Gather all Font Resources from all pages
-    # Open the PDF specifically for resource gathering
-    pdf = pikepdf.open(str(input_path))
-    try:
-        font_data_map = _gather_fonts_from_pdf(pdf)
-    finally:
-        pdf.close()
-
-    # 2. Scan content streams to find *used* character codes
-    # Re-open PDF to reset it for content scanning (preserving original behavior)
-    pdf = pikepdf.open(str(input_path))
+    # 1. Gather font resources and scan content streams for *used* character
+    # codes in a single pass over one open document
+    pdf = _open_pdf(input_path, data)
     try:
-        scan_for_text_content(pdf, font_data_map)
+        font_data_map = _inspect_pages(pdf)
     finally:
         pdf.close()
 
-    # 3. Filter and Report
+    # 2. Filter and Report
     final_map = _filter_unused_fonts(font_data_map)
     _report_inspection_results(len(final_map))
 
     return final_map
 
 
-def _gather_fonts_from_pdf(pdf: pikepdf.Pdf) -> Dict[str, FontData]:
-    """Iterates through pages to collect all unique font resources."""
-    font_data_map: Dict[str, FontData] = {}
-
-    for page in pdf.pages:
-        _collect_fonts_from_page(page, font_data_map)
-
-    return font_data_map
+def _open_pdf(input_path: Path, data: Optional[bytes]) -> pikepdf.Pdf:
+    """Opens the PDF from in-memory bytes if available, else from disk."""
+    if data is not None:
+        return pikepdf.open(io.BytesIO(data))
+    return pikepdf.open(str(input_path))
 
 
-def _collect_fonts_from_page(page: pikepdf.Page, font_data_map: Dict[str, FontData]):
-    """Collects fonts from a single page's resources."""
-    if "/Font" not in page.Resources:
+def _collect_fonts_from_page(font_data_map: Dict[str, FontData], fonts: Any):
+    """Collects fonts from a single page's /Font resources."""
+    if not fonts:
         return
 
-    for font_name, font_dict in page.Resources["/Font"].items():
+    for font_name, font_dict in fonts.items():
         font_name_str = str(font_name)
 
         if font_name_str in font_data_map:
@@ -170,23 +204,19 @@ def _collect_fonts_from_page(page: pikepdf.Page, font_data_map: Dict[str, FontDa
 
 
 def _initialize_font_data(font_name: str, font_dict: Any) -> FontData:
-    """Creates a FontData object and performs initial Type 3 checks."""
-    current_font_data = FontData(font_name, font_dict)
-
-    # Access CharProcs to trigger any necessary loading/validation
-    # matching the behavior of the original code
-    if "/CharProcs" in font_dict:
-        cp = font_dict["/CharProcs"]
-        keys = list(cp.keys())
-        if keys:
-            _ = cp[keys[0]].read_bytes()
-
-    return current_font_data
+    """
+    Creates a FontData object. Type 3 glyph procedures are read there, only
+    as far as the metrics need them.
+    """
+    return FontData(font_name, font_dict)
 
 
 def _filter_unused_fonts(font_data_map: Dict[str, FontData]) -> Dict[str, FontData]:
-    """Returns a dictionary containing only fonts that have used characters."""
-    return {name: data for name, data in font_data_map.items() if data.used_char_codes}
+    """Removes fonts without used characters from the map, in place, and returns it."""
+    unused = [name for name, data in font_data_map.items() if not data.used_char_codes]
+    for name in unused:
+        del font_data_map[name]
+    return font_data_map
 
 
 def _report_inspection_results(count: int):
@@ -234,11 +264,34 @@ def _write_empty_template(path: Path, data: Dict[str, Any]):
 
 def _write_config_file(path: Path, data: Dict[str, Any]):
     """Helper to write the JSON config file."""
+    text = _dumps_indented(data, _TEMPLATE_INDENT_DEPTH)
     with open(str(path), "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+        f.write(text)
     logger.info("Generated configuration template: %s", path.name)
 
 
+def _dumps_indented(obj: Any, depth: int, level: int = 0) -> str:
+    """
+    Serializes `obj` like json.dumps(indent=4) down to `depth` levels of
+    nesting, and compactly (using the C encoder) below that.
+    """
+    if level >= depth or not isinstance(obj, (dict, list)) or not obj:
+        return json.dumps(obj)
+
+    pad = "    " * (level + 1)
+    if isinstance(obj, dict):
+        lines = [
+            f"{pad}{json.dumps(str(key))}: {_dumps_indented(value, depth, level + 1)}"
+            for key, value in obj.items()
+        ]
+        brackets = "{}"
+    else:
+        lines = [pad + _dumps_indented(value, depth, level + 1) for value in obj]
+        brackets = "[]"
+
+    return f"{brackets[0]}\n" + ",\n".join(lines) + f"\n{'    ' * level}{brackets[1]}"
+
+
 def _create_rule_template(font_name: str, data: FontData) -> Dict[str, Any]:
     """Constructs a single rule dictionary for the template."""
     char_details = []
@@ -249,7 +302,7 @@ def _create_rule_template(font_name: str, data: FontData) -> Dict[str, Any]:
                 "hex": f"0x{code:02x}",
                 "width": round(width, 3),
                 "name": data.char_names.get(code, "N/A"),
-                "pages": sorted(list(data.char_pages[code])),
+                "pages": sorted(data.char_pages[code]),
             }
         )
 
@@ -3,15 +3,16 @@
 Module for generating diagnostic PDFs that visualize font usage and metrics.
 """
 
+import heapq
 import logging
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import pikepdf
 
 # Models are still needed
 from swapfont.models import FontData
-from swapfont.utils.pdf_resources import find_resource_recursive
+from swapfont.utils.pdf_resources import find_resource_recursive, index_resources
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +29,47 @@ SUM_FONT_SZ = 7
 LABEL_W = 40
 BLOCK_H = (SUM_ROW_H * 4) + 8
 
+# Characters that must be backslash-escaped inside a PDF literal string
+_PDF_STRING_ESCAPES = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)"})
+
+PAGE_LIST_MAX_CHARS = 40
+PAGE_LIST_MAX_ITEMS = (PAGE_LIST_MAX_CHARS + 2) // 3
+
+
+def _code_labels(codec: str) -> tuple:
+    """
+    What each single-byte code decodes to under `codec`, as shown in the
+    detailed table: blank for control codes, empty if it matches the code.
+    """
+    labels = []
+    for code in range(256):
+        char = bytes([code]).decode(codec, errors="replace")
+        if code < 32:
+            char = " "
+        elif len(char) == 1 and ord(char) == code:
+            char = ""
+        labels.append(char)
+    return tuple(labels)
+
+
+def _format_page_list(pages) -> str:
+    """
+    Comma-separated page numbers in ascending order, cut to 40 characters.
+    At most 14 numbers fit ("1, 2, ..., 14"), so only that many are sorted.
+    """
+    shown = heapq.nsmallest(PAGE_LIST_MAX_ITEMS, pages)
+    page_str = ", ".join(map(str, shown))
+    if len(page_str) > PAGE_LIST_MAX_CHARS or len(pages) > PAGE_LIST_MAX_ITEMS:
+        page_str = page_str[: PAGE_LIST_MAX_CHARS - 3] + "..."
+    return page_str
+
+
+WINANSI_LABELS = _code_labels("cp1252")
+MACROMAN_LABELS = _code_labels("mac_roman")
+# Decimal and hex spellings of every single-byte code, shared by both tables
+DECIMAL_LABELS = tuple(str(code) for code in range(256))
+HEX_LABELS = tuple(f"{code:02X}" for code in range(256))
+
 
 def find_font_object(pdf: pikepdf.Pdf, font_name: str) -> Any:
     """
@@ -55,35 +97,58 @@ class DiagnosticPDFGenerator:
         )
         self.current_page = None
         self.y_cursor = 0.0
-        self.content_stream: List[str] = []
+        # Page content, one operator sequence per line, already encoded
+        self.content_stream = bytearray()
         self.font_resource_cache: Dict[str, Any] = {}
 
+        # Font resource name -> source font object, built on first use.
+        # When writing into the source document itself, index it before any
+        # report page (with its own /Helvetica) is added.
+        self._src_font_index: Optional[Dict[str, Any]] = None
+        if src_pdf is out_pdf:
+            self._src_font_index = index_resources(src_pdf, "/Font")
+
         # Drawing State
         self.active_font = "/Helvetica"
         self.active_size = FONT_SIZE
 
-    def start_new_page(self):
-        """Finalizes the current page and creates a new one."""
+    def _find_source_font(self, font_name: str) -> Any:
+        """Looks up a source font by resource name, indexing the fonts once."""
+        if self._src_font_index is None:
+            self._src_font_index = index_resources(self.src_pdf, "/Font")
+        return self._src_font_index.get(font_name)
+
+    def _emit(self, line: str):
+        """Appends one line of operators to the page content."""
+        self.content_stream += line.encode("latin1", errors="replace")
+        self.content_stream += b"\n"
+
+    def _flush_page(self):
+        """Writes the accumulated content to the current page."""
         if self.current_page is not None and self.content_stream:
-            stream_data = "\n".join(self.content_stream).encode(
-                "latin1", errors="replace"
+            self.current_page.Contents = self.out_pdf.make_stream(
+                bytes(self.content_stream)
             )
-            self.current_page.Contents = self.out_pdf.make_stream(stream_data)
+
+    def start_new_page(self):
+        """Finalizes the current page and creates a new one."""
+        self._flush_page()
 
         self.current_page = self.out_pdf.add_blank_page(
             page_size=(PAGE_WIDTH, PAGE_HEIGHT)
         )
 
+        # Helvetica plus every source font copied so far, in one dictionary
         self.current_page.Resources = pikepdf.Dictionary(
-            {"/Font": pikepdf.Dictionary({"/Helvetica": self.helvetica_font})}
+            {
+                "/Font": pikepdf.Dictionary(
+                    {"/Helvetica": self.helvetica_font, **self.font_resource_cache}
+                )
+            }
         )
 
-        # Ensure source fonts are available
-        for fname, fobj in self.font_resource_cache.items():
-            self.current_page.Resources["/Font"][fname] = fobj
-
         self.y_cursor = PAGE_HEIGHT - MARGIN
-        self.content_stream = []
+        self.content_stream = bytearray()
 
         # Reset state on new page
         self.active_font = "/Helvetica"
@@ -110,13 +175,10 @@ class DiagnosticPDFGenerator:
         if y is None:
             y = self.y_cursor
 
-        safe_text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
-        try:
-            safe_text.encode("latin1")
-        except UnicodeEncodeError:
-            safe_text = safe_text.encode("latin1", errors="replace").decode("latin1")
+        safe_text = text.translate(_PDF_STRING_ESCAPES)
 
-        self.content_stream.append(
+        # Characters outside latin1 become "?" when the line is encoded
+        self._emit(
             f"BT {self.active_font} {self.active_size:.4f} Tf {x} {y} Td ({safe_text}) Tj ET"
         )
 
@@ -162,23 +224,17 @@ class DiagnosticPDFGenerator:
         ops = []
         ops.append(f"1 0 0 {tm_d:.2f} {x:.2f} {y:.2f} Tm")
 
-        self.content_stream.append("BT")
-        self.content_stream.append(" ".join(ops))
-        self.content_stream.append(
-            f"{self.active_font} {tf_size:.4f} Tf <{hex_str}> Tj ET"
-        )
+        self._emit("BT")
+        self._emit(" ".join(ops))
+        self._emit(f"{self.active_font} {tf_size:.4f} Tf <{hex_str}> Tj ET")
 
     def draw_line(self, x1: float, y1: float, x2: float, y2: float):
         """Draws a real graphic line using PDF operators."""
-        self.content_stream.append(f"q 0.5 w {x1} {y1} m {x2} {y2} l S Q")
+        self._emit(f"q 0.5 w {x1} {y1} m {x2} {y2} l S Q")
 
     def finalize(self):
         """Flushes the last page content."""
-        if self.current_page is not None and self.content_stream:
-            stream_data = "\n".join(self.content_stream).encode(
-                "latin1", errors="replace"
-            )
-            self.current_page.Contents = self.out_pdf.make_stream(stream_data)
+        self._flush_page()
 
     def draw_header(self, cols):
         """Draw Header"""
@@ -229,10 +285,10 @@ class DiagnosticPDFGenerator:
             # Draw Data Cells
             current_x = MARGIN + LABEL_W
             for code in chunk:
-                hex_s = f"{code:02X}"
+                hex_s = HEX_LABELS[code]
 
                 self.set_font("/Helvetica", SUM_FONT_SZ)
-                self.draw_text(str(code), current_x, y=self.y_cursor)
+                self.draw_text(DECIMAL_LABELS[code], current_x, y=self.y_cursor)
                 self.draw_text(hex_s, current_x, y=self.y_cursor - SUM_ROW_H)
 
                 self.set_font(font_name, 9)
@@ -269,28 +325,16 @@ class DiagnosticPDFGenerator:
         for code, width in sorted(data.used_char_codes.items()):
             self.ensure_space(LINE_HEIGHT)
 
-            hex_str = f"{code:02X}"
+            hex_str = HEX_LABELS[code]
             char_name = data.char_names.get(code, "")
-            page_list = sorted(list(data.char_pages[code]))
-            page_str = ", ".join(map(str, page_list))
-            if len(page_str) > 40:
-                page_str = page_str[:37] + "..."
-
-            byte_val = bytes([code])
-            char_win = byte_val.decode("cp1252", errors="replace")
-            char_mac = byte_val.decode("mac_roman", errors="replace")
-
-            if code < 32:
-                char_win = char_mac = " "
+            page_str = _format_page_list(data.char_pages[code])
 
-            if len(char_win) == 1 and ord(char_win) == code:
-                char_win = ""
-            if len(char_mac) == 1 and ord(char_mac) == code:
-                char_mac = ""
+            char_win = WINANSI_LABELS[code]
+            char_mac = MACROMAN_LABELS[code]
 
             self.set_font("/Helvetica", FONT_SIZE)
-            self.draw_text(str(code), cols["code"])
-            self.draw_text(f"0x{hex_str}", cols["hex"])
+            self.draw_text(DECIMAL_LABELS[code], cols["code"])
+            self.draw_text("0x" + hex_str, cols["hex"])
             self.draw_text(f"{width:.1f}", cols["width"])
 
             self.set_font(font_name, 12)
@@ -318,11 +362,12 @@ class DiagnosticPDFGenerator:
         if not font_name.startswith("/"):
             font_name = "/" + font_name
         if font_name not in self.font_resource_cache:
-            src_font_obj = find_font_object(self.src_pdf, font_name)
+            src_font_obj = self._find_source_font(font_name)
             if src_font_obj:
-                self.font_resource_cache[font_name] = self.out_pdf.copy_foreign(
-                    src_font_obj
-                )
+                # Report pages appended to the source document share its fonts
+                if self.src_pdf is not self.out_pdf:
+                    src_font_obj = self.out_pdf.copy_foreign(src_font_obj)
+                self.font_resource_cache[font_name] = src_font_obj
                 self.current_page.Resources["/Font"][font_name] = (
                     self.font_resource_cache[font_name]
                 )
@@ -333,10 +378,10 @@ class DiagnosticPDFGenerator:
         self.draw_text(f"FONT: {data.source_name}   {status}", MARGIN)
         self.y_cursor -= LINE_HEIGHT
 
-        pages_str = ", ".join(map(str, sorted(list(data.pages_used))[:15]))
+        pages_str = ", ".join(map(str, heapq.nsmallest(15, data.pages_used)))
         if len(data.pages_used) > 15:
             pages_str += "..."
-        sizes_str = ", ".join(map(str, sorted(list(data.point_sizes))))
+        sizes_str = ", ".join(map(str, sorted(data.point_sizes)))
 
         self.set_font("/Helvetica", FONT_SIZE)
         self.draw_text(f"Type: {data.font_type} | Base: {data.base_font}", MARGIN + 10)
@@ -369,13 +414,11 @@ def generate_diagnostic_pdf(input_path: Path, font_data_map: Dict[str, FontData]
     output_path = input_path.parent / f"{input_path.stem}_diagnostic.pdf"
     logger.info("Generating diagnostic PDF: %s", output_path.name)
 
-    src_pdf = pikepdf.open(str(input_path))
-    out_pdf = pikepdf.Pdf.new()
-
-    for page in src_pdf.pages:
-        out_pdf.pages.append(page)
+    # The report pages are appended to the source document and saved under a
+    # new name, so the source pages are written out without being copied.
+    pdf = pikepdf.open(str(input_path))
 
-    gen = DiagnosticPDFGenerator(src_pdf, out_pdf)
+    gen = DiagnosticPDFGenerator(pdf, pdf)
     gen.start_new_page()
 
     gen.set_font("/Helvetica", 14)
@@ -393,7 +436,5 @@ def generate_diagnostic_pdf(input_path: Path, font_data_map: Dict[str, FontData]
         gen.draw_font_section(font_name, data)
 
     gen.finalize()
-    out_pdf.save(output_path)
-
-    src_pdf.close()
-    out_pdf.close()
+    pdf.save(output_path)
+    pdf.close()
@@ -4,10 +4,13 @@ Data models for swapfont configuration and font analysis.
 """
 
 import logging
+import re
 import unicodedata
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Annotated, Any, Dict, List, Optional, Set, Union
+from decimal import Decimal
+from functools import lru_cache
+from typing import Annotated, Any, Dict, List, Optional, Set, Tuple, Union
 
 import pikepdf
 from fontTools.ttLib import TTLibError
@@ -27,6 +30,17 @@ logger = logging.getLogger(__name__)
 # Standard PDF operators that display text
 TEXT_SHOWING_OPERATORS = ["Tj", "TJ", "'", '"']
 
+# Six numbers followed by the d1 operator at the start of a Type 3 glyph
+# program; anything else falls back to a full content stream parse.
+_LEADING_D1_RE = re.compile(
+    rb"\s*((?:[+-]?(?:\d+\.?\d*|\.\d+)\s+){6})d1(?![^\s\[\]<>(){}/%])"
+)
+
+# Exact Python types of numeric content stream operands (pikepdf yields int
+# and Decimal, rewritten operands hold float). Hot loops test
+# `type(x) in NUMERIC_OPERAND_TYPES`, which is cheaper than isinstance.
+NUMERIC_OPERAND_TYPES = frozenset({int, float, Decimal})
+
 
 def resolve_unicode_name(val: str) -> str:
     """
@@ -34,11 +48,31 @@ def resolve_unicode_name(val: str) -> str:
     to its unicode character (e.g. "\ufb01").
     Returns the original string if it is already short or lookup fails.
     """
-    if len(val) <= 1:
+    # Unicode character names are ASCII, so anything else is already literal
+    if len(val) <= 1 or not val.isascii():
         return val
 
     clean_val = val.strip().upper().replace("-", " ")
 
+    resolved = _lookup_unicode_description(clean_val)
+    if resolved is not None:
+        return resolved
+
+    # 3. Warn but return original
+    if " " in clean_val:
+        logger.warning(
+            "Could not resolve unicode description '%s'. Using as literal.", val
+        )
+
+    return val
+
+
+@lru_cache(maxsize=4096)
+def _lookup_unicode_description(clean_val: str) -> Optional[str]:
+    """
+    Unicode database lookups behind resolve_unicode_name, cached since
+    rules repeat the same names. Returns None if nothing matches.
+    """
     # 1. Try Exact Lookup
     try:
         return unicodedata.lookup(clean_val)
@@ -60,13 +94,17 @@ def resolve_unicode_name(val: str) -> str:
         except (KeyError, ValueError):
             pass
 
-    # 3. Warn but return original
-    if " " in clean_val:
-        logger.warning(
-            "Could not resolve unicode description '%s'. Using as literal.", val
-        )
+    return None
 
-    return val
+
+def _parse_bbox(font_bbox: Any) -> Optional[List[float]]:
+    """A /FontBBox array as floats, or None if it is absent or malformed."""
+    if font_bbox is None:
+        return None
+    try:
+        return [float(x) for x in font_bbox]
+    except (ValueError, TypeError):
+        return None
 
 
 class SmartEncodingMap(dict):
@@ -76,25 +114,36 @@ class SmartEncodingMap(dict):
 
     def __getitem__(self, key: Any) -> Any:
         # 1. Fast Path: Direct lookup
-        if super().__contains__(key):
-            return super().__getitem__(key)
+        value = dict.get(self, key, _MISSING)
+        if value is not _MISSING:
+            return value
 
         # 2. Integer Lookup Fallback
         if isinstance(key, int):
-            candidates = [
-                f"0x{key:02x}",  # "0x0c"
-                f"0x{key:x}",  # "0xc"
-                f"0X{key:02X}",  # "0X0C"
-                f"0X{key:X}",  # "0XC"
-                str(key),  # "12"
-            ]
-            for cand in candidates:
-                if super().__contains__(cand):
-                    return super().__getitem__(cand)
+            for cand in _int_key_spellings(key):
+                value = dict.get(self, cand, _MISSING)
+                if value is not _MISSING:
+                    return value
 
         raise KeyError(key)
 
 
+_MISSING = object()
+
+
+@lru_cache(maxsize=1024)
+def _int_key_spellings(key: int) -> Tuple[str, ...]:
+    """String forms an integer key may take in a config, in lookup order."""
+    candidates = (
+        f"0x{key:02x}",  # "0x0c"
+        f"0x{key:x}",  # "0xc"
+        f"0X{key:02X}",  # "0X0C"
+        f"0X{key:X}",  # "0XC"
+        str(key),  # "12"
+    )
+    return tuple(dict.fromkeys(candidates))
+
+
 def _to_smart_map(v: Any) -> SmartEncodingMap:
     """Validator to ensure input is wrapped in SmartEncodingMap."""
     return SmartEncodingMap(v) if v else SmartEncodingMap()
@@ -207,6 +256,27 @@ class FontData:
     Tracks page usage, metrics, and Type 3 specific data.
     """
 
+    __slots__ = (
+        "base_font",
+        "char_names",
+        "char_pages",
+        "first_char",
+        "font_bbox",
+        "font_dict",
+        "font_matrix",
+        "font_type",
+        "is_embedded",
+        "is_type3",
+        "missing_width",
+        "pages_used",
+        "point_sizes",
+        "source_name",
+        "type3_design_height",
+        "type3_design_width",
+        "used_char_codes",
+        "widths",
+    )
+
     def __init__(self, source_name: str, font_dict: pikepdf.Dictionary):
         self.source_name = source_name
         self.font_dict = font_dict
@@ -235,9 +305,9 @@ class FontData:
 
         self.type3_design_height: float = 0.0
         self.type3_design_width: float = 0.0
-        self.is_type3: bool = False
+        # font_type already holds the /Subtype, so it is not read again
+        self.is_type3: bool = self.font_type == "/Type3"
         try:
-            self.is_type3 = font_dict.get("/Subtype") == pikepdf.Name("/Type3")
             if self.is_type3:
                 self._extract_initial_bbox(font_dict)
         except TTLibError:
@@ -259,13 +329,26 @@ class FontData:
     def __repr__(self):
         return f"<FontData {self.source_name} type={self.font_type}>"
 
+    def __getstate__(self):
+        """
+        Pickles every slot except font_dict, so unpickled FontData comes back
+        with font_dict=None. The live pikepdf dictionary belongs to the
+        inspected document and cannot be pickled; everything derived from it
+        is kept (swapfont.cache relies on this).
+        """
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["font_dict"] = None
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def _extract_initial_bbox(self, font_dict):
-        font_bbox = font_dict.get("/FontBBox")
-        if font_bbox and len(font_bbox) == 4:
-            try:
-                self.type3_design_height = float(font_bbox[3]) - float(font_bbox[1])
-            except (TypeError, ValueError):
-                pass
+        # A Type 3 font's own /FontBBox takes precedence over its descriptor's
+        self.font_bbox = _parse_bbox(font_dict.get("/FontBBox"))
+        if self.font_bbox and len(self.font_bbox) == 4:
+            self.type3_design_height = self.font_bbox[3] - self.font_bbox[1]
 
     def _check_embedded(self, font_dict: pikepdf.Dictionary):
         """Checks if the font contains embedding streams."""
@@ -278,25 +361,18 @@ class FontData:
             ):
                 self.is_embedded = True
 
-            if "/MissingWidth" in font_descriptor:
+            missing_width = font_descriptor.get("/MissingWidth")
+            if missing_width is not None:
                 try:
-                    self.missing_width = float(font_descriptor["/MissingWidth"])
+                    self.missing_width = float(missing_width)
                 except (ValueError, TypeError):
                     pass
 
-            if "/FontBBox" in font_descriptor:
-                try:
-                    self.font_bbox = [float(x) for x in font_descriptor["/FontBBox"]]
-                except (ValueError, TypeError):
-                    pass
+            if self.font_bbox is None:
+                self.font_bbox = _parse_bbox(font_descriptor.get("/FontBBox"))
 
         if self.font_type == "/Type3":
             self.is_embedded = True
-            if "/FontBBox" in font_dict:
-                try:
-                    self.font_bbox = [float(x) for x in font_dict["/FontBBox"]]
-                except (ValueError, TypeError):
-                    pass
 
     def _extract_metrics(self, font_dict: pikepdf.Dictionary):
         """Extracts standard PDF font metrics (Widths, FirstChar)."""
@@ -305,9 +381,10 @@ class FontData:
         self._extract_encoding(font_dict)
 
     def _extract_font_matrix(self, font_dict: pikepdf.Dictionary):
-        if "/FontMatrix" in font_dict:
+        font_matrix = font_dict.get("/FontMatrix")
+        if font_matrix is not None:
             try:
-                fm = [float(x) for x in font_dict["/FontMatrix"]]
+                fm = [float(x) for x in font_matrix]
                 if len(fm) == 6:
                     self.font_matrix = fm
             except (ValueError, TypeError):
@@ -318,10 +395,12 @@ class FontData:
         if self.font_matrix[0] > 0:
             norm_factor = self.font_matrix[0] * 1000.0
 
-        if "/FirstChar" in font_dict and "/Widths" in font_dict:
+        first_char = font_dict.get("/FirstChar")
+        widths = font_dict.get("/Widths")
+        if first_char is not None and widths is not None:
             try:
-                self.first_char = int(font_dict["/FirstChar"])
-                self.widths = [float(w) * norm_factor for w in font_dict["/Widths"]]
+                self.first_char = int(first_char)
+                self.widths = [float(w) * norm_factor for w in widths]
                 logger.debug(
                     "Extracted widths for %s: FirstChar=%d, Count=%d, NormFactor=%.3f",
                     self.source_name,
@@ -341,14 +420,16 @@ class FontData:
 
         if isinstance(encoding_obj, pikepdf.Dictionary):
             if "/Differences" in encoding_obj:
-                diff_arr = encoding_obj["/Differences"]
+                pairs = []
                 current_code = -1
-                for item in diff_arr:
+                name_type = pikepdf.Name
+                for item in encoding_obj["/Differences"]:
                     if isinstance(item, int):
                         current_code = item
-                    elif isinstance(item, pikepdf.Name) and current_code != -1:
-                        self.char_names[current_code] = str(item)
+                    elif current_code != -1 and isinstance(item, name_type):
+                        pairs.append((current_code, str(item)))
                         current_code += 1
+                self.char_names.update(pairs)
         elif isinstance(encoding_obj, pikepdf.Name):
             pass
 
@@ -363,56 +444,57 @@ class FontData:
         if not hasattr(char_procs, "keys") or not char_procs:
             return
 
-        bounds = {
-            "min_llx": float("inf"),
-            "max_urx": float("-inf"),
-            "min_lly": float("inf"),
-            "max_ury": float("-inf"),
-            "valid_samples": 0,
-        }
+        # One (llx, lly, urx, ury) tuple per glyph with a usable d1
+        rows: List[Tuple[float, float, float, float]] = []
 
         # Scan ALL glyphs to ensure deterministic sizing based on true maximums
-        all_keys = list(char_procs.keys())
+        logger.debug("T3: Scanning %d CharProcs for metrics...", len(char_procs))
 
-        logger.debug("T3: Scanning %d CharProcs for metrics...", len(all_keys))
+        for key in char_procs:
+            self._process_charproc_sample(char_procs[key], key, rows)
 
-        for key in all_keys:
-            self._process_charproc_sample(char_procs[key], key, bounds)
+        if not rows:
+            return
 
-        if bounds["valid_samples"] > 0 and bounds["max_ury"] > bounds["min_lly"]:
-            self.type3_design_width = bounds["max_urx"] - bounds["min_llx"]
-            self.type3_design_height = bounds["max_ury"] - bounds["min_lly"]
+        llxs, llys, urxs, urys = zip(*rows)
+        min_lly, max_ury = min(llys), max(urys)
+        if max_ury > min_lly:
+            self.type3_design_width = max(urxs) - min(llxs)
+            self.type3_design_height = max_ury - min_lly
             logger.debug(
                 "Est. Type 3 Design Height for %s: %.2f (Samples: %d)",
                 self.source_name,
                 self.type3_design_height,
-                bounds["valid_samples"],
+                len(rows),
             )
 
-    def _process_charproc_sample(self, stream_obj, key, bounds):
+    def _process_charproc_sample(self, stream_obj, key, rows):
         """Parses a single CharProc stream to find its bounding box."""
         try:
+            # A glyph program must begin with d0 or d1, so the bbox can
+            # usually be read off the start of the stream without tokenizing
+            # the whole program.
+            match = _LEADING_D1_RE.match(stream_obj.read_bytes())
+            if match:
+                self._update_bounds_from_operands(match.group(1).split(), rows)
+                return
+
             instructions = parse_content_stream(stream_obj)
             for operands, operator in instructions:
                 # 'd1' operator defines glyph width and bounding box
                 if operator.unparse() == b"d1":
-                    self._update_bounds_from_operands(operands, bounds)
+                    self._update_bounds_from_operands(operands, rows)
                     break
 
         except (pikepdf.PdfError, RuntimeError) as parsing_error:
             logger.warning("T3: Robust parsing failed for %s: %s", key, parsing_error)
 
-    def _update_bounds_from_operands(self, operands, bounds):
-        """Updates bounds dictionary from d1 operands."""
+    def _update_bounds_from_operands(self, operands, rows):
+        """Appends the glyph bbox from d1 operands to rows."""
         if len(operands) < 6:
             return
         try:
-            llx, lly, urx, ury = map(float, operands[2:6])
-            bounds["min_llx"] = min(bounds["min_llx"], llx)
-            bounds["max_urx"] = max(bounds["max_urx"], urx)
-            bounds["min_lly"] = min(bounds["min_lly"], lly)
-            bounds["max_ury"] = max(bounds["max_ury"], ury)
-            bounds["valid_samples"] += 1
+            rows.append(tuple(map(float, operands[2:6])))
         except (ValueError, TypeError):
             pass
 
@@ -1,6 +1,7 @@
 # src/swapfont/utils/__init__.py
-from .pdf_resources import find_resource_recursive
+from .pdf_resources import find_resource_recursive, index_resources
 
 __all__ = [
     "find_resource_recursive",
+    "index_resources",
 ]
@@ -1,11 +1,14 @@
 # src/swapfont/utils/pdf_resources.py
 import logging
-from typing import Any, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set
 
 import pikepdf
 
 logger = logging.getLogger(__name__)
 
+# Comparing against a Name skips converting it from str on every XObject
+_FORM = pikepdf.Name("/Form")
+
 
 def find_resource_recursive(
     pdf: pikepdf.Pdf, resource_type: str, resource_name: str
@@ -14,48 +17,80 @@ def find_resource_recursive(
     Searches for a specific resource (e.g. a Font named '/F1') across all pages
     and their nested XObjects.
     """
-    visited_xobjects: Set[int] = set()
+    type_key = _as_key(resource_type)
+    target_key = _as_key(resource_name)
 
-    for page in pdf.pages:
-        result = _search_container(page, resource_type, resource_name, visited_xobjects)
+    for resources in _iter_resources(pdf):
+        result = _check_immediate_resources(type_key, resources, target_key)
         if result:
             return result
     return None
 
 
-def _search_container(
-    container: Any, resource_type: str, target_name: str, visited: Set[int]
-) -> Optional[Any]:
-    """Recursively searches a container (Page or XObject). resource_type is e.g., '/Font'"""
-    if "/Resources" not in container:
-        return None
+def index_resources(pdf: pikepdf.Pdf, resource_type: str) -> Dict[str, Any]:
+    """
+    Maps every resource name of one type (e.g. '/Font') used on any page or
+    nested Form XObject to its object, in a single walk over the document.
+    Where a name is reused, the first occurrence in page order wins, as with
+    find_resource_recursive.
+    """
+    index: Dict[str, Any] = {}
+    type_key = _as_key(resource_type)
 
-    resources = container.Resources
-    return (
-        _check_immediate_resources(resource_type, resources, target_name)
-        or _next_xobject_match(resource_type, resources, target_name, visited)
-        or None
-    )
+    for resources in _iter_resources(pdf):
+        by_name = resources.get(type_key)
+        if by_name is not None:
+            for name, obj in by_name.items():
+                index.setdefault(str(name), obj)
+    return index
 
 
-def _check_immediate_resources(resource_type, resources, target_name):
-    # Check immediate resources
-    # resource_type is e.g. "/Font"
-    if resource_type in resources:
-        target_key = target_name if target_name.startswith("/") else "/" + target_name
-        if target_key in resources[resource_type]:
-            return resources[resource_type][target_key]
-    return None
+def _as_key(name: str) -> str:
+    """Spells a resource type or name as a dictionary key, e.g. 'F1' -> '/F1'."""
+    return name if name.startswith("/") else "/" + name
 
 
-def _next_xobject_match(resource_type, resources, target_name, visited):
-    if "/XObject" in resources:
-        for _, xobj in resources["/XObject"].items():
-            if not isinstance(xobj, pikepdf.Object) or xobj.objgen in visited:
+def _iter_resources(pdf: pikepdf.Pdf) -> Iterator[Any]:
+    """
+    Yields the /Resources of every page and nested Form XObject, depth first
+    in page order. Each Form XObject, and each indirect /Resources dictionary,
+    is visited once per document however many pages share it, and cyclic
+    references end the descent.
+    """
+    visited_xobjects: Set[Any] = set()
+    visited_resources: Set[Any] = set()
+    # Containers still to visit, next one last
+    stack: List[Any] = list(reversed(pdf.pages))
+
+    while stack:
+        resources = stack.pop().get("/Resources")
+        if resources is None:
+            continue
+        if resources.is_indirect:
+            if resources.objgen in visited_resources:
                 continue
-            visited.add(xobj.objgen)
+            visited_resources.add(resources.objgen)
+        yield resources
 
-            if xobj.get("/Subtype") == "/Form":
-                return _search_container(xobj, resource_type, target_name, visited)
+        xobjects = resources.get("/XObject")
+        if xobjects is None:
+            continue
 
-    return None
+        forms = []
+        for _, xobj in xobjects.items():
+            if not isinstance(xobj, pikepdf.Object) or xobj.objgen in visited_xobjects:
+                continue
+            visited_xobjects.add(xobj.objgen)
+
+            if xobj.get("/Subtype") == _FORM:
+                forms.append(xobj)
+        stack.extend(reversed(forms))
+
+
+def _check_immediate_resources(type_key, resources, target_key):
+    # Check immediate resources
+    # type_key is e.g. "/Font", target_key e.g. "/F1"
+    by_name = resources.get(type_key)
+    if by_name is None:
+        return None
+    return by_name.get(target_key)
@@ -2,7 +2,7 @@
 """Interactive tool for relatively user friendly PDF font replacement"""
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 
 import click
 
@@ -10,6 +10,16 @@ from swapfont.core import process_pdf
 from swapfont.inspection.analyzer import inspect_pdf
 from swapfont.models import ReplacementConfig, ReplacementRule
 
+# Ligature slots of the standard TeX OT1 encoding, as (letters, character)
+_LIGATURES = {
+    11: ("ff", "\ufb00"),
+    12: ("fi", "\ufb01"),
+    13: ("fl", "\ufb02"),
+    14: ("ffi", "\ufb03"),
+    15: ("ffl", "\ufb04"),
+}
+_LIGATURE_CODES = frozenset(_LIGATURES)
+
 
 @click.command()
 @click.argument("input_pdf", type=click.Path(exists=True))
@@ -60,7 +70,7 @@ def wizard(  # pylint: disable=too-many-arguments, too-many-positional-arguments
     input_path = Path(input_pdf)
 
     if output is None:
-        output = _configure_output_path(input_path)
+        output = str(input_path.with_name(f"{input_path.stem}_new.pdf"))
 
     click.echo(f"Inspecting {input_path}...")
     font_data_map = inspect_pdf(input_path)
@@ -70,7 +80,7 @@ def wizard(  # pylint: disable=too-many-arguments, too-many-positional-arguments
         return
 
     # Process CLI replacements into a dictionary
-    cli_replacements = _prepare_replacements_map(replace_font)
+    cli_replacements = dict(replace_font)
 
     # Main Rule Generation Logic
     rules = _generate_rules(
@@ -93,19 +103,6 @@ def wizard(  # pylint: disable=too-many-arguments, too-many-positional-arguments
     click.echo(f"Done! Saved to {output}")
 
 
-def _configure_output_path(input_path: Path) -> str:
-    """Generates a default output filename."""
-    # Changed suffix to _new.pdf to match test expectation
-    return str(input_path.with_name(f"{input_path.stem}_new.pdf"))
-
-
-def _prepare_replacements_map(
-    replace_font_options: Tuple[Tuple[str, str], ...],
-) -> Dict[str, str]:
-    """Converts the tuple of CLI options into a dictionary."""
-    return dict(replace_font_options)
-
-
 def _generate_rules(
     font_data_map,
     cli_replacements,
@@ -192,13 +189,14 @@ def _handle_ligatures(
     if no_ligatures:
         return enc_map
 
-    used_codes = getattr(font_data, "used_char_codes", set())
+    used_codes = getattr(font_data, "used_char_codes", ())
 
-    # Check for 'fi' ligature (code 12 in standard TeX OT1)
-    if 12 in used_codes:
-        if accept_ligatures:
-            enc_map["0x0c"] = "fi"
-        elif click.confirm("Detected potential 'fi' ligature (code 12). Map to 'fi'?"):
-            enc_map["0x0c"] = "fi"
+    for code in sorted(_LIGATURE_CODES.intersection(used_codes)):
+        letters, ligature = _LIGATURES[code]
+        if accept_ligatures or click.confirm(
+            f"Detected potential '{letters}' ligature (code {code}). "
+            f"Map to '{ligature}'?"
+        ):
+            enc_map[f"0x{code:02x}"] = ligature
 
     return enc_map
@@ -67,3 +67,42 @@ def test_cli_default_output(tmp_files):
         args, kwargs = mock_process.call_args
         auto_output = input_pdf.with_name(f"{input_pdf.stem}_replaced.pdf")
         assert args[1] == auto_output
+
+
+@pytest.mark.parametrize(
+    "options, expected",
+    [
+        ([], {"jobs": 1, "use_cache": False, "fast_save": False}),
+        (
+            ["--jobs", "4", "--cache", "--fast-save"],
+            {"jobs": 4, "use_cache": True, "fast_save": True},
+        ),
+        (["-j", "2"], {"jobs": 2, "use_cache": False, "fast_save": False}),
+    ],
+)
+def test_cli_passes_run_options_to_process_pdf(tmp_files, options, expected):
+    input_pdf, config_json, _ = tmp_files
+
+    with (
+        patch("swapfont.cli.process_pdf") as mock_process,
+        patch("swapfont.cli.ReplacementConfig"),
+    ):
+        result = CliRunner().invoke(
+            main, ["run", str(input_pdf), str(config_json), *options]
+        )
+
+    assert result.exit_code == 0
+    _, kwargs = mock_process.call_args
+    assert kwargs == expected
+
+
+def test_cli_rejects_zero_jobs(tmp_files):
+    input_pdf, config_json, _ = tmp_files
+
+    with patch("swapfont.cli.process_pdf") as mock_process:
+        result = CliRunner().invoke(
+            main, ["run", str(input_pdf), str(config_json), "--jobs", "0"]
+        )
+
+    assert result.exit_code != 0
+    mock_process.assert_not_called()
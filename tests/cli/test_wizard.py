@@ -73,7 +73,7 @@ def test_wizard_successful_flow(mock_dependencies, tmp_path):
     rule = config.rules[0]
     assert rule.source_font_name == "/F1"
     assert rule.target_font_file == str(replacement_font)
-    assert rule.encoding_map.get("0x0c") == "fi"
+    assert rule.encoding_map.get("0x0c") == "\ufb01"
 
 
 def test_wizard_default_output_path(mock_dependencies, tmp_path):
@@ -192,4 +192,35 @@ def test_wizard_ligature_flags(mock_deps, tmp_path):
     ]
     result = runner.invoke(wizard, cli_args_accept)
     config = mock_proc.call_args[0][2]
-    assert config.rules[0].encoding_map["0x0c"] == "fi"
+    assert config.rules[0].encoding_map["0x0c"] == "\ufb01"
+
+
+def test_wizard_maps_every_ot1_ligature_in_use(mock_deps, tmp_path):
+    """Each used OT1 ligature slot (11-15) maps to its ligature character."""
+    mock_insp, mock_proc = mock_deps
+    mock_font = SimpleNamespace(
+        font_type="Type1", used_char_codes={11, 12, 13, 14, 15, 65}
+    )
+    mock_insp.return_value = {"/F1": mock_font}
+
+    input_pdf = tmp_path / "test.pdf"
+    input_pdf.touch()
+    ttf_path = tmp_path / "arial.ttf"
+    ttf_path.touch()
+
+    result = CliRunner().invoke(
+        wizard,
+        [str(input_pdf), "--replace-font", "/F1", str(ttf_path), "--yes"],
+        input="y\n" * 5,
+    )
+
+    assert "'ff' ligature (code 11)" in result.output
+    assert "'ffl' ligature (code 15)" in result.output
+    config = mock_proc.call_args[0][2]
+    assert config.rules[0].encoding_map == {
+        "0x0b": "\ufb00",
+        "0x0c": "\ufb01",
+        "0x0d": "\ufb02",
+        "0x0e": "\ufb03",
+        "0x0f": "\ufb04",
+    }
@@ -45,10 +45,6 @@ def build_test_editor(iterator, config=None, source_width=1000.0, target_width=5
     mock_metrics = MagicMock()
     mock_metrics.get_char_width.return_value = target_width
 
-    mock_source = MagicMock()
-    mock_source.get_width.return_value = source_width
-    source_cache = {"/F1": mock_source}
-
     loaded_fonts = {"dummy.ttf": mock_metrics}
     encoding_maps = {"dummy.ttf": {65: "A"}}
 
@@ -56,13 +52,13 @@ def build_test_editor(iterator, config=None, source_width=1000.0, target_width=5
     tracker = FontedStateTracker(loaded_fonts, encoding_maps)
 
     layout = LayoutEngine(
-        config, loaded_fonts, encoding_maps, source_cache, source_pikepdf_fonts={}
+        config, loaded_fonts, encoding_maps, {}, source_pikepdf_fonts={}
     )
 
     layout.active_wrapper = MagicMock()
     # 4. Critical Logic Mocks (The "Boilerplate" we want to hide)
     layout.set_active_font = MagicMock(return_value=("F_New", 10.0))
-    layout.rewrite_text_operands = MagicMock(side_effect=lambda op, ops: ops)
+    layout.rewrite_workspace = MagicMock(side_effect=lambda ws: ws)
     # We mock this to ensure math isolation, using the requested target_width
     target_pts = target_width * (10.0 / 1000.0)  # Convert units to pts at 10pt size
     layout.calculate_target_visual_width = MagicMock(return_value=target_pts)
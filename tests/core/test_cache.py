@@ -0,0 +1,76 @@
+import os
+import pickle
+
+from swapfont import cache
+from swapfont.models import FontData
+
+from ..helpers import create_pdf_file_with_text
+
+
+def test_load_source_fonts_reuses_cached_inspection(tmp_path, monkeypatch):
+    pdf_path = create_pdf_file_with_text(tmp_path, text="ABC")
+    cache_dir = tmp_path / "cache"
+
+    calls = []
+    real_inspect = cache.inspect_pdf
+
+    def counting_inspect(path, data=None):
+        calls.append(path)
+        return real_inspect(path, data=data)
+
+    monkeypatch.setattr(cache, "inspect_pdf", counting_inspect)
+
+    first = cache.load_source_fonts(pdf_path, cache_dir=cache_dir)
+    second = cache.load_source_fonts(pdf_path, cache_dir=cache_dir)
+
+    assert len(calls) == 1
+    assert list(second) == list(first)
+    name = next(iter(first))
+    assert second[name].used_char_codes == first[name].used_char_codes
+    assert second[name].font_dict is None
+
+
+def test_load_source_fonts_ignores_corrupt_entry(tmp_path, monkeypatch):
+    pdf_path = create_pdf_file_with_text(tmp_path, text="ABC")
+    cache_dir = tmp_path / "cache"
+    cache.load_source_fonts(pdf_path, cache_dir=cache_dir)
+
+    (entry,) = cache_dir.iterdir()
+    entry.write_bytes(b"not a pickle")
+
+    result = cache.load_source_fonts(pdf_path, cache_dir=cache_dir)
+    assert result
+    # The corrupt entry was replaced by a fresh one
+    assert isinstance(pickle.loads(entry.read_bytes()), dict)
+
+
+def test_load_source_fonts_keys_entries_by_version(tmp_path, monkeypatch):
+    pdf_path = create_pdf_file_with_text(tmp_path, text="ABC")
+    cache_dir = tmp_path / "cache"
+
+    monkeypatch.setattr(cache, "__version__", "1.0")
+    cache.load_source_fonts(pdf_path, cache_dir=cache_dir)
+    monkeypatch.setattr(cache, "__version__", "1.1")
+    cache.load_source_fonts(pdf_path, cache_dir=cache_dir)
+
+    names = sorted(entry.name for entry in cache_dir.iterdir())
+    assert [name.rsplit("-", 1)[1] for name in names] == ["1.0.pkl", "1.1.pkl"]
+
+
+def test_prune_cache_drops_least_recently_used(tmp_path):
+    for n, name in enumerate(["old", "mid", "new"]):
+        entry = tmp_path / f"{name}.pkl"
+        entry.write_bytes(b"x" * 10)
+        os.utime(entry, (n, n))
+
+    cache._prune_cache(tmp_path, max_bytes=20)
+
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["mid.pkl", "new.pkl"]
+
+
+def test_font_data_pickles_without_font_dict():
+    fd = FontData("/F1", {"/Subtype": "/Type1", "/FirstChar": 65, "/Widths": [500]})
+    restored = pickle.loads(pickle.dumps(fd))
+    assert restored.font_dict is None
+    assert restored.widths == fd.widths
+    assert restored.get_width(65) == 500.0
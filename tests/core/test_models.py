@@ -8,6 +8,7 @@ from swapfont.models import (
     FontData,
     ReplacementConfig,
     ReplacementRule,
+    SmartEncodingMap,
     resolve_unicode_name,
 )
 
@@ -19,6 +20,7 @@ def test_resolve_unicode_name_logic(caplog):
     """
     # Case 1: Short string (passthrough)
     assert resolve_unicode_name("A") == "A"
+    assert resolve_unicode_name("\ufb00i") == "\ufb00i"  # non-ASCII is literal
 
     # Case 2: Exact Unicode Lookup
     assert resolve_unicode_name("LATIN SMALL LETTER A") == "a"
@@ -159,6 +161,28 @@ def test_replacement_rule_normalize_keys():
     assert rule.encoding_map["1"] == "A"
 
 
+def test_resolve_unicode_name_warns_on_every_unresolved_call(caplog):
+    """Caching the lookups must not swallow repeated warnings."""
+    with caplog.at_level(logging.WARNING):
+        for _ in range(2):
+            assert resolve_unicode_name("not a real glyph") == "not a real glyph"
+    assert len(caplog.records) == 2
+    assert resolve_unicode_name("latin small ligature fi") == "\ufb01"
+
+
+def test_smart_encoding_map_integer_key_spellings():
+    smart = SmartEncodingMap(
+        {"0xc": "short hex", "0X1F": "upper hex", "200": "decimal", "0x0d": None}
+    )
+    assert smart[12] == "short hex"
+    assert smart[31] == "upper hex"
+    assert smart[200] == "decimal"
+    # A stored None is a hit, not a miss
+    assert smart[13] is None
+    with pytest.raises(KeyError):
+        smart[14]
+
+
 def test_replacement_config_list():
     rule = ReplacementRule(
         source_font_name="/F1",
@@ -237,6 +261,21 @@ def test_fontdata_fontbbox_type3_error(type3_font_dict):
     assert fd.font_bbox is None
 
 
+def test_fontdata_type3_bbox_precedes_descriptor_bbox(type3_font_dict):
+    type3_font_dict["/FontDescriptor"] = pikepdf.Dictionary(
+        {"/FontBBox": pikepdf.Array([0, 0, 10, 10])}
+    )
+    type3_font_dict["/FontBBox"] = pikepdf.Array([0, -2, 8, 6])
+
+    fd = FontData("/F1", type3_font_dict)
+    assert fd.font_bbox == [0.0, -2.0, 8.0, 6.0]
+    assert fd.type3_design_height == 8.0
+
+    # A malformed Type 3 bbox falls back to the descriptor's
+    type3_font_dict["/FontBBox"] = pikepdf.Array([0, pikepdf.Name("/Bad")])
+    assert FontData("/F1", type3_font_dict).font_bbox == [0.0, 0.0, 10.0, 10.0]
+
+
 def test_fontdata_fontmatrix_error(empty_font_dict):
     """Covers lines 136-141 (FontMatrix ValueError/TypeError/IndexError)."""
     # 1. Non-numeric value
@@ -51,12 +51,7 @@ def strict_replacement_rule():
     )
 
 
-@pytest.fixture
-def mock_source_cache():
-    return {}
-
-
-def make_editor_params(config, target_cache, source_cache, source_pikepdf_fonts):
+def make_editor_params(config, target_cache, source_type3_scales, source_pikepdf_fonts):
     # We need to import the real classes since we aren't using StreamEditor to build them
 
     from swapfont.engines.layout_engine import LayoutEngine
@@ -69,7 +64,7 @@ def make_editor_params(config, target_cache, source_cache, source_pikepdf_fonts)
         config,
         target_cache,
         custom_encoding_maps={},
-        source_font_cache=source_cache,
+        source_type3_scales=source_type3_scales,
         source_pikepdf_fonts=source_pikepdf_fonts,
     )
 
@@ -102,10 +97,8 @@ def test_text_replacement_scaling_real_objects():
     mock_target_wrapper.get_char_width.return_value = 500
     target_cache = {"target.ttf": mock_target_wrapper}
 
-    # Source Cache
-    mock_source_data = MagicMock()
-    mock_source_data.is_type3 = False
-    source_cache = {"/F1": mock_source_data}
+    # Source font is not Type 3, so it has no design height scale
+    source_type3_scales = {}
 
     # FIX: Populate source_pikepdf_fonts
     # The fallback calculation looks up the font here to get widths.
@@ -152,7 +145,7 @@ def test_text_replacement_scaling_real_objects():
     mock_iterator.__iter__.return_value = [step_tf, step_tj]
 
     handler, tracker = make_editor_params(
-        config, target_cache, source_cache, source_pikepdf_fonts
+        config, target_cache, source_type3_scales, source_pikepdf_fonts
     )
     # Initialize Editor with injected dependencies
     editor = StreamEditor(
@@ -169,22 +162,12 @@ def test_text_replacement_scaling_real_objects():
     assert b"200 Tz" in output_stream
 
 
-def test_text_replacement_logic(
-    mock_font_metrics, strict_replacement_rule, mock_source_cache
-):
+def test_text_replacement_logic(mock_font_metrics, strict_replacement_rule):
     """
     Verifies the replacement math using a STRICT scaling rule.
     Source Width = 10.0. Target Width = 5.0.
     Expected Scaling (Tz) = 200%.
     """
-    mock_font_data = MagicMock()
-    mock_font_data.get_width.return_value = 1000.0
-    mock_font_data.type3_design_height = 0
-    mock_font_data.is_type3 = False
-
-    mock_source_cache["/F1"] = mock_font_data
-    mock_source_cache["F1"] = mock_font_data
-
     loaded_fonts = {"dummy.ttf": mock_font_metrics}
     encoding_maps = {"dummy.ttf": {65: "A"}}
     config = ReplacementConfig(rules=[strict_replacement_rule])
@@ -217,7 +200,7 @@ def test_text_replacement_logic(
         config,
         target_font_cache=loaded_fonts,
         custom_encoding_maps=encoding_maps,
-        source_font_cache=mock_source_cache,
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
     tracker = FontedStateTracker(loaded_fonts, encoding_maps)
@@ -242,7 +225,7 @@ def test_text_replacement_logic(
 
     # Apply mock to the variable we hold
     layout_engine.set_active_font = MagicMock(side_effect=side_effect_set_active_font)
-    layout_engine.rewrite_text_operands = MagicMock(side_effect=lambda op, ops: ops)
+    layout_engine.rewrite_workspace = MagicMock(side_effect=lambda ws: ws)
 
     # 5. Create Editor with injected dependencies
     editor = StreamEditor(
@@ -253,6 +236,7 @@ def test_text_replacement_logic(
 
     # Check for Tz scaling: 10 source / 5 target = 2 = 200%
     assert b"200 Tz" in output_stream
+    layout_engine.rewrite_workspace.assert_called()
 
 
 def test_text_array_kerning_preservation():
@@ -437,7 +421,12 @@ def test_process_pdf_page_corruption_handling(mock_core_deps, tmp_path, mocker):
 
 from pikepdf import Dictionary, Name
 
-from swapfont.core import _patch_font_encoding, _update_page_resources
+from swapfont.core import (
+    _add_font_resources,
+    _patch_font_encoding,
+    _target_font_resources,
+    _type3_scales,
+)
 
 
 def test_patch_font_encoding_generates_correct_structures():
@@ -474,9 +463,34 @@ def test_patch_font_encoding_generates_correct_structures():
     assert diffs[3] == Name("/i_glyph")
 
 
-def test_update_page_resources_handles_missing_dicts():
+def test_patch_font_encoding_skips_chars_missing_from_cmap():
+    font_obj = Dictionary()
+    mock_metrics = MagicMock()
+    mock_metrics.cmap = {ord("f"): "f"}
+
+    _patch_font_encoding(font_obj, ["f", "x"], {"f": 128, "x": 129}, mock_metrics)
+
+    assert list(font_obj["/Encoding"]["/Differences"]) == [128, Name("/f")]
+
+
+def test_patch_font_encoding_escapes_irregular_glyph_names():
+    font_obj = Dictionary()
+    mock_metrics = MagicMock()
+    mock_metrics.cmap = {ord("f"): "f (alt)#2", ord("g"): "g/h"}
+
+    _patch_font_encoding(font_obj, ["f", "g"], {"f": 128, "g": 129}, mock_metrics)
+
+    assert list(font_obj["/Encoding"]["/Differences"]) == [
+        128,
+        Name("/f (alt)#2"),
+        129,
+        Name("/g/h"),
+    ]
+
+
+def test_add_font_resources_handles_missing_dicts():
     """
-    Verifies that _update_page_resources robustly creates /Resources and /Font
+    Verifies that _add_font_resources robustly creates /Resources and /Font
     dictionaries if they are missing from the page.
     """
     # Setup Page with NO resources
@@ -501,9 +515,18 @@ def test_update_page_resources_handles_missing_dicts():
     embedded_objects = {"dummy.ttf": mock_font_obj}
 
     # Execute
-    _update_page_resources(pike_page, config, embedded_objects)
+    _add_font_resources(pike_page, _target_font_resources(config, embedded_objects))
 
     # Assert
     assert "/Font" in pike_page.Resources
     assert "/NewFont" in pike_page.Resources["/Font"]
     assert pike_page.Resources["/Font"]["/NewFont"] == mock_font_obj
+
+
+def test_type3_scales_keeps_only_type3_design_heights():
+    source_fonts = {
+        "/F1": MagicMock(is_type3=False, type3_design_height=0.0),
+        "/T3": MagicMock(is_type3=True, type3_design_height=0.5),
+        "/T0": MagicMock(is_type3=True, type3_design_height=0.0),
+    }
+    assert _type3_scales(source_fonts) == {"/T3": 0.5}
@@ -1,6 +1,9 @@
+import io
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
+from fontTools.ttLib import TTFont
 
 from swapfont.font_embedding import (
     FontMetricsData,
@@ -76,6 +79,7 @@ def test_widths_array(monkeypatch):
     # .notdef is default
     assert widths[0] == 600.0
 
+
 # --- Merged from test_font_embedding_extra.py ---
 # tests/test_font_embedding_extra.py
 from unittest.mock import MagicMock
@@ -106,6 +110,19 @@ def test_embed_truetype_font_file_not_found(tmp_path):
         fe.embed_truetype_font(pdf, str(missing))
 
 
+def test_embed_truetype_font_empty_file_is_not_a_font(tmp_path):
+    pdf = pikepdf.new()
+    empty = tmp_path / "empty.ttf"
+    empty.write_bytes(b"")
+    with pytest.raises(fe.TTLibError):
+        fe.embed_truetype_font(pdf, str(empty))
+
+
+def test_pdf_real_array_matches_pikepdf_float_conversion():
+    values = [0.0, 600.0, 1000 / 2048, -12.3456789, 1234.5678905, 2.5e-7]
+    assert fe._pdf_real_array(values).unparse() == pikepdf.Array(values).unparse()
+
+
 def make_tt_mock(
     ps_name="Arial",
     units_per_em=1000,
@@ -229,6 +246,27 @@ def test__widths_array_with_notdef_and_missing_chars():
     assert widths[0] == 1000.0
 
 
+def test_embed_truetype_font_subsets_font_program():
+    """Subsetting keeps the requested glyphs by name and tags the font name."""
+    font_path = Path(__file__).parent.parent / "fixtures" / "Roboto-Regular.ttf"
+    pdf = pikepdf.new()
+
+    font_obj = embed_truetype_font(
+        pdf, str(font_path), {128: "\u03c0"}, subset_unicodes=range(65, 91)
+    )
+
+    descriptor = font_obj["/FontDescriptor"]
+    data = descriptor["/FontFile2"].read_bytes()
+    assert len(data) < font_path.stat().st_size // 4
+    assert str(font_obj["/BaseFont"]).endswith("+Roboto-Regular")
+    assert descriptor["/FontName"] == font_obj["/BaseFont"]
+
+    cmap = TTFont(io.BytesIO(data)).getBestCmap()
+    assert cmap[ord("A")] == "A"
+    assert 0x03C0 in cmap
+    assert ord("a") not in cmap
+
+
 def test_embed_truetype_font_success(tmp_path, monkeypatch):
     """
     Hybrid: use a real pikepdf.Pdf but patch TTFont and internal helpers so we don't need a real TTF.
@@ -264,6 +302,11 @@ def test_embed_truetype_font_success(tmp_path, monkeypatch):
     assert font_obj["/BaseFont"] == "/DropIn"
     assert len(font_obj["/Widths"]) == 256
 
+    font_file = font_obj["/FontDescriptor"]["/FontFile2"]
+    assert font_file.read_bytes() == b"\x00\x01\x02\x03"
+    assert font_file["/Length1"] == 4
+
+
 # --- Merged from test_font_embedding_extra2.py ---
 # tests/test_font_embedding.py
 
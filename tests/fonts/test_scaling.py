@@ -68,7 +68,7 @@ def test_layout_engine_applies_scaling_percentage():
         config=config,
         target_font_cache=target_cache,
         custom_encoding_maps={},
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
 
@@ -103,18 +103,14 @@ def test_layout_engine_scaling_combines_with_type3_scaling():
 
     # Setup Type 3 Source Data
     # Simulate a Type 3 font that is effectively 0.5 height of a normal font
-    mock_source_data = MagicMock()
-    mock_source_data.is_type3 = True
-    mock_source_data.type3_design_height = 0.5
-
-    source_cache = {"/Type3Font": mock_source_data}
+    source_type3_scales = {"/Type3Font": 0.5}
     target_cache = {"dummy.ttf": MagicMock()}
 
     engine = LayoutEngine(
         config=config,
         target_font_cache=target_cache,
         custom_encoding_maps={},
-        source_font_cache=source_cache,
+        source_type3_scales=source_type3_scales,
         source_pikepdf_fonts={},
     )
 
@@ -63,11 +63,36 @@ def test_get_char_width_empty_string():
     fm.close()
 
 
+def test_load_shares_wrapper_per_path(tmp_path):
+    font_copy = tmp_path / "font.ttf"
+    font_copy.write_bytes(open(TEST_FONT_PATH, "rb").read())
+
+    first = FontWrapper.load(str(font_copy))
+    assert FontWrapper.load(str(font_copy)) is first
+
+    # A changed file is parsed again
+    font_copy.write_bytes(font_copy.read_bytes() + b"\0")
+    assert FontWrapper.load(str(font_copy)) is not first
+
+
+def test_close_keeps_shared_wrapper_usable(tmp_path):
+    font_copy = tmp_path / "font.ttf"
+    font_copy.write_bytes(open(TEST_FONT_PATH, "rb").read())
+
+    shared = FontWrapper.load(str(font_copy))
+    shared.close()
+
+    again = FontWrapper.load(str(font_copy))
+    assert again is shared
+    assert again.ttfont["maxp"].numGlyphs > 0
+
+
 def test_close_multiple_times():
     fm = FontWrapper(TEST_FONT_PATH)
     fm.close()
     fm.close()  # should not raise
 
+
 # --- Merged from test_font_utils_extra.py ---
 # tests/test_font_utils_extra.py
 from unittest.mock import MagicMock, patch
@@ -116,6 +141,7 @@ def test_close_calls_ttfont_close(monkeypatch):
     fm.close()
     fake_tt.close.assert_called_once()
 
+
 # --- Merged from test_font_utils_gap.py ---
 # tests/test_font_utils_gap.py
 import logging
@@ -182,3 +208,16 @@ def test_font_wrapper_cleanup():
         wrapper = FontWrapper("dummy.ttf")
         wrapper.close()
         mock_ttfont.close.assert_called_once()
+
+
+def test_get_char_width_is_memoized_per_char(caplog):
+    """Each distinct char is resolved once; repeats come from the cache."""
+    fm = FontWrapper(TEST_FONT_PATH)
+    with caplog.at_level("WARNING"):
+        first = [fm.get_char_width(c) for c in "AAB￿￿"]
+        second = [fm.get_char_width(c) for c in "AAB￿￿"]
+
+    assert first == second
+    assert first[0] == fm._lookup_char_width("A")
+    assert sum(".notdef" in rec.message for rec in caplog.records) == 1
+    fm.close()
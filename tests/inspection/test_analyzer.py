@@ -3,6 +3,8 @@ import json
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pikepdf
+
 from swapfont.inspection.analyzer import (
     _handle_font_operator,
     _handle_text_operator,
@@ -36,6 +38,14 @@ def test_process_text_token_adds_char_codes():
     assert fd.char_pages[code] == {1}
 
 
+def test_process_text_token_uses_raw_string_bytes():
+    fd = FontData("F1", {})
+    # 0x80 and 0x93 decode to non-latin1 characters under PDFDocEncoding
+    _process_text_token(pikepdf.String(b"\x80\x93A"), fd, page_num=2)
+    assert set(fd.used_char_codes) == {0x80, 0x93, ord("A")}
+    assert fd.char_pages[0x80] == {2}
+
+
 def test_handle_text_operator_skips_invalid_font():
     font_data_map = {}
     # Should not raise
@@ -69,12 +79,14 @@ def test_inspect_pdf_opens_pdf(mock_open, monkeypatch):
     mock_open.return_value = fake_pdf
 
     monkeypatch.setattr(
-        "swapfont.inspection.analyzer.scan_for_text_content",
-        lambda pdf, fd_map: None,
+        "swapfont.inspection.analyzer._inspect_pages",
+        lambda pdf: {},
     )
 
     result = inspect_pdf(Path("fake.pdf"))
-    assert isinstance(result, dict)
+    assert result == {}
+    mock_open.assert_called_once_with("fake.pdf")
+    fake_pdf.close.assert_called_once()
 
 
 ##################################################
@@ -91,6 +103,20 @@ def test_inspect_pdf_with_real_pdf(tmp_path: Path):
     assert some_font_data.used_char_codes
 
 
+def test_inspect_pdf_opens_document_once(tmp_path: Path):
+    pdf_path = create_pdf_file_with_text(tmp_path, text="ABC")
+
+    with patch(
+        "swapfont.inspection.analyzer.pikepdf.open",
+        wraps=pikepdf.open,
+    ) as mock_open:
+        result = inspect_pdf(pdf_path)
+
+    assert mock_open.call_count == 1
+    some_font_data = next(iter(result.values()))
+    assert set(some_font_data.used_char_codes) == {ord("A"), ord("B"), ord("C")}
+
+
 def test_inspect_pdf_no_fonts(tmp_path: Path):
     pdf_path = create_pdf_file_with_text(tmp_path)
     result = inspect_pdf(pdf_path)
@@ -148,6 +174,21 @@ def test_generate_template_config_nonempty(tmp_path):
     assert rule["characters_used"][0]["code"] == 65
 
 
+def test_generate_template_config_writes_one_line_per_character(tmp_path):
+    fd = FontData("F1", {})
+    for code in (65, 66):
+        fd.used_char_codes[code] = 500
+        fd.char_pages[code].update({1, 2})
+
+    generate_template_config({"F1": fd}, tmp_path / "dummy.pdf")
+
+    text = (tmp_path / "font_rules.json").read_text(encoding="utf-8")
+    entry_lines = [line for line in text.splitlines() if '"code":' in line]
+    assert len(entry_lines) == 2
+    assert '"pages": [1, 2]' in entry_lines[0]
+    assert json.loads(text)["rules"][0]["characters_used"][1]["hex"] == "0x42"
+
+
 def test_main_pdf_not_found(tmp_path):
     # Provide a path that does not exist
     missing_pdf = tmp_path / "nonexistent.pdf"
@@ -242,12 +283,14 @@ def test_inspect_pdf_opens_pdf(mock_open, monkeypatch):
     mock_open.return_value = fake_pdf
 
     monkeypatch.setattr(
-        "swapfont.inspection.analyzer.scan_for_text_content",
-        lambda pdf, fd_map: None,
+        "swapfont.inspection.analyzer._inspect_pages",
+        lambda pdf: {},
     )
 
     result = inspect_pdf(Path("fake.pdf"))
-    assert isinstance(result, dict)
+    assert result == {}
+    mock_open.assert_called_once_with("fake.pdf")
+    fake_pdf.close.assert_called_once()
 
 
 def test_inspect_pdf_empty_pdf(tmp_path: Path):
@@ -66,12 +66,14 @@ def test_inspect_pdf_opens_pdf(mock_open, monkeypatch):
     mock_open.return_value = fake_pdf
 
     monkeypatch.setattr(
-        "swapfont.inspection.analyzer.scan_for_text_content",
-        lambda pdf, fd_map: None,
+        "swapfont.inspection.analyzer._inspect_pages",
+        lambda pdf: {},
     )
 
     result = inspect_pdf(Path("fake.pdf"))
-    assert isinstance(result, dict)
+    assert result == {}
+    mock_open.assert_called_once_with("fake.pdf")
+    fake_pdf.close.assert_called_once()
 
 
 ##################################################
@@ -136,6 +138,45 @@ def test_find_font_object(tmp_path):
     pdf.close()
 
 
+def test_index_resources_covers_pages_and_form_xobjects():
+    import pikepdf
+    from pikepdf import Dictionary, Name
+
+    from swapfont.utils import index_resources
+
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+    pdf.add_blank_page()
+
+    def font(base):
+        return pdf.make_indirect(Dictionary({"/BaseFont": Name(base)}))
+
+    def form(fonts):
+        xobj = pdf.make_stream(b"")
+        xobj.Subtype = Name("/Form")
+        xobj.Resources = Dictionary({"/Font": Dictionary(fonts)})
+        return xobj
+
+    pdf.pages[0].Resources = Dictionary(
+        {
+            "/Font": Dictionary({"/F1": font("/First")}),
+            "/XObject": Dictionary(
+                {
+                    "/X1": form({"/F2": font("/InForm")}),
+                    "/X2": form({"/F3": font("/Late")}),
+                }
+            ),
+        }
+    )
+    pdf.pages[1].Resources = Dictionary({"/Font": Dictionary({"/F1": font("/Second")})})
+
+    index = index_resources(pdf, "/Font")
+
+    assert sorted(index) == ["/F1", "/F2", "/F3"]
+    assert index["/F1"].BaseFont == "/First"  # first page wins
+    assert index["/F3"].BaseFont == "/Late"
+
+
 from pikepdf import Pdf
 
 from swapfont.inspection.diagnostic import DiagnosticPDFGenerator
@@ -242,6 +283,13 @@ def test_generate_diagnostic_pdf(tmp_path):
     diag_pdf_path = tmp_path / f"{pdf_path.stem}_diagnostic.pdf"
     assert diag_pdf_path.exists()
 
+    # Source pages come first, and report pages reuse the source font object
+    with Pdf.open(pdf_path) as src, Pdf.open(diag_pdf_path) as out:
+        assert len(out.pages) > len(src.pages)
+        src_font = out.pages[0].Resources["/Font"]["/F1"]
+        report_font = out.pages[len(src.pages)].Resources["/Font"]["/F1"]
+        assert report_font.objgen == src_font.objgen
+
 
 # --- Merged from test_diagnostic_math.py ---
 
@@ -252,7 +300,7 @@ import pytest
 class MockDiagnostic(DiagnosticPDFGenerator):
     def __init__(self):
         # Minimal init to support draw_hex_sample
-        self.content_stream = []
+        self.content_stream = bytearray()
         self.active_size = 12.0  # Target size = 12pt
         self.y_cursor = 100.0
         self.active_font = "/F1"
@@ -263,13 +311,18 @@ def diag_tool():
     return MockDiagnostic()
 
 
+def stream_lines(content_stream):
+    """Splits the encoded page content back into operator lines."""
+    return bytes(content_stream).decode("latin1").splitlines()
+
+
 def get_tf_operator(content_stream):
     """
     Helper to parse the last appended stream line and find '... Tf'.
     Example line: '/F1 0.6000 Tf <A1> Tj ET'
     Returns: 0.6000 (float)
     """
-    last_op = content_stream[-1]
+    last_op = stream_lines(content_stream)[-1]
     parts = last_op.split()
     if "Tf" in parts:
         idx = parts.index("Tf")
@@ -345,5 +398,98 @@ class TestDiagnosticMath:
 
         # Check the Tm operator (the line before Tf)
         # Expected: "1 0 0 -1.00 50.00 100.00 Tm"
-        tm_op = diag_tool.content_stream[-2]
+        tm_op = stream_lines(diag_tool.content_stream)[-2]
         assert "-1.00" in tm_op
+
+
+def test_draw_text_escapes_and_replaces_non_latin1(diag_tool):
+    diag_tool.active_font = "/Helvetica"
+    diag_tool.draw_text("π(x)", 10, 20)
+
+    assert stream_lines(diag_tool.content_stream) == [
+        "BT /Helvetica 12.0000 Tf 10 20 Td (?\\(x\\)) Tj ET"
+    ]
+
+
+def test_code_labels_show_only_differing_characters():
+    from swapfont.inspection.diagnostic import MACROMAN_LABELS, WINANSI_LABELS
+
+    assert WINANSI_LABELS[0x41] == "" and MACROMAN_LABELS[0x41] == ""
+    assert WINANSI_LABELS[0x80] == "€"  # Euro sign
+    assert MACROMAN_LABELS[0x80] == "Ä"  # A with diaeresis
+    assert WINANSI_LABELS[0x05] == MACROMAN_LABELS[0x05] == " "
+
+
+def test_format_page_list_sorts_and_truncates():
+    from swapfont.inspection.diagnostic import _format_page_list
+
+    assert _format_page_list({3, 1, 2}) == "1, 2, 3"
+    assert _format_page_list(set(range(1, 10))) == ", ".join(map(str, range(1, 10)))
+    long = _format_page_list(set(range(1, 200)))
+    assert long == ", ".join(map(str, range(1, 200)))[:37] + "..."
+
+
+def test_new_page_carries_cached_source_fonts():
+    from pikepdf import Dictionary, Name
+
+    out_pdf = Pdf.new()
+    gen = DiagnosticPDFGenerator(Pdf.new(), out_pdf)
+    src_font = out_pdf.make_indirect(Dictionary({"/Type": Name("/Font")}))
+    gen.font_resource_cache["/F1"] = src_font
+
+    gen.start_new_page()
+
+    fonts = gen.current_page.Resources["/Font"]
+    assert set(fonts.keys()) == {"/Helvetica", "/F1"}
+    assert fonts["/F1"].objgen == src_font.objgen
+
+
+def test_find_font_object_searches_every_form_xobject():
+    import pikepdf
+    from pikepdf import Dictionary, Name
+
+    from swapfont.utils import find_resource_recursive
+
+    pdf = pikepdf.new()
+    pdf.add_blank_page()
+
+    def form(resources):
+        xobj = pdf.make_stream(b"")
+        xobj.Subtype = Name("/Form")
+        xobj.Resources = resources
+        return xobj
+
+    inner = form(Dictionary({"/Font": Dictionary({"/F9": Dictionary(A=1)})}))
+    pdf.pages[0].Resources = Dictionary(
+        {
+            "/XObject": Dictionary(
+                {
+                    "/X1": form(Dictionary()),
+                    "/X2": form(Dictionary({"/XObject": Dictionary({"/Y": inner})})),
+                }
+            )
+        }
+    )
+    # A form that draws itself must not loop forever
+    inner.Resources.XObject = Dictionary({"/Self": inner})
+
+    assert find_font_object(pdf, "F9").A == 1
+    assert find_resource_recursive(pdf, "Font", "F9").A == 1
+    assert find_font_object(pdf, "/Missing") is None
+
+
+def test_shared_resources_dictionary_is_walked_once():
+    import pikepdf
+    from pikepdf import Dictionary
+
+    from swapfont.utils.pdf_resources import _iter_resources
+
+    pdf = pikepdf.new()
+    shared = pdf.make_indirect(Dictionary({"/Font": Dictionary()}))
+    for _ in range(3):
+        pdf.add_blank_page()
+        pdf.pages[-1].Resources = shared
+    pdf.add_blank_page()
+    pdf.pages[-1].Resources = Dictionary({"/Font": Dictionary()})
+
+    assert len(list(_iter_resources(pdf))) == 2
@@ -19,6 +19,46 @@ def get_cached_font(cache_dir: Path) -> Path:
     return font_path
 
 
+def _make_input_pdf(path: Path, *contents: bytes, forms=None):
+    """
+    Saves a PDF with one page per content stream, each using Helvetica as /F1.
+    `forms` maps XObject names to (content, font name) pairs; each becomes a
+    Form XObject, using the same font, shared by every page.
+    """
+    pdf = pikepdf.new()
+    font = pdf.make_indirect(
+        pikepdf.Dictionary(
+            {
+                "/Type": pikepdf.Name("/Font"),
+                "/Subtype": pikepdf.Name("/Type1"),
+                "/BaseFont": pikepdf.Name("/Helvetica"),
+            }
+        )
+    )
+
+    xobjects = {}
+    for name, (content, font_name) in (forms or {}).items():
+        form = pdf.make_stream(content)
+        form.Type = pikepdf.Name("/XObject")
+        form.Subtype = pikepdf.Name("/Form")
+        form.BBox = [0, 0, 612, 792]
+        form.Resources = pikepdf.Dictionary(
+            {"/Font": pikepdf.Dictionary({font_name: font})}
+        )
+        xobjects[name] = form
+
+    for content in contents:
+        page = pdf.add_blank_page()
+        page.Contents = pdf.make_stream(content)
+        resources = {"/Font": pikepdf.Dictionary({"/F1": font})}
+        if xobjects:
+            resources["/XObject"] = pikepdf.Dictionary(xobjects)
+        page.Resources = pikepdf.Dictionary(resources)
+
+    pdf.save(path)
+    pdf.close()
+
+
 def test_full_pdf_processing_pipeline(tmp_path, replacement_config_data):
     """
     Tests the complete process_pdf function using real file I/O and real font parsing.
@@ -31,31 +71,9 @@ def test_full_pdf_processing_pipeline(tmp_path, replacement_config_data):
     font_path = get_cached_font(tmp_path)
 
     # --- Setup: Create Physical Input PDF ---
-    pdf = pikepdf.new()
-    page = pdf.add_blank_page()
-
-    # Content: /F1 10 Tf (A) Tj
+    # Content: /F1 10 Tf (A) Tj, with Helvetica as /F1
     content_stream = b"/F1 10 Tf (A) Tj"
-    page.Contents = pdf.make_stream(content_stream)
-
-    # Add Resource Dictionary for /F1
-    page.Resources = pikepdf.Dictionary(
-        {
-            "/Font": pikepdf.Dictionary(
-                {
-                    "/F1": pikepdf.Dictionary(
-                        {
-                            "/Type": pikepdf.Name("/Font"),
-                            "/Subtype": pikepdf.Name("/Type1"),
-                            "/BaseFont": pikepdf.Name("/Helvetica"),
-                        }
-                    )
-                }
-            )
-        }
-    )
-    pdf.save(input_pdf_path)
-    pdf.close()
+    _make_input_pdf(input_pdf_path, content_stream)
 
     # --- Configuration ---
     if "rules" in replacement_config_data:
@@ -92,3 +110,107 @@ def test_full_pdf_processing_pipeline(tmp_path, replacement_config_data):
         # Ideally, we check that the *new* font name (e.g. /F1_0 or /F_New) is in the stream.
         # Since the name is auto-generated, we can just check it's NOT just the old stream.
         assert raw_stream != content_stream
+
+
+def test_parallel_processing_matches_serial(tmp_path, replacement_config_data):
+    """
+    Rewriting pages in worker processes must produce the same content streams
+    (including a Form XObject shared by several pages) as the serial path.
+    """
+    input_pdf_path = tmp_path / "input.pdf"
+    font_path = get_cached_font(tmp_path)
+
+    _make_input_pdf(
+        input_pdf_path,
+        *(
+            f"BT /F1 10 Tf 72 {700 - n} Td (A{n}A) Tj ET /Fm1 Do".encode()
+            for n in range(5)
+        ),
+        forms={"/Fm1": (b"BT /F1 12 Tf (AAA) Tj ET", "/F1")},
+    )
+
+    rule = replacement_config_data["rules"][0]
+    rule["target_font_file"] = str(font_path)
+    config = ReplacementConfig(**replacement_config_data)
+
+    serial_path = tmp_path / "serial.pdf"
+    parallel_path = tmp_path / "parallel.pdf"
+    process_pdf(input_pdf_path, serial_path, config)
+    process_pdf(input_pdf_path, parallel_path, config, jobs=3)
+
+    with pikepdf.open(serial_path) as serial, pikepdf.open(parallel_path) as parallel:
+        assert len(serial.pages) == len(parallel.pages)
+        for s_page, p_page in zip(serial.pages, parallel.pages):
+            assert s_page.Contents.read_bytes() == p_page.Contents.read_bytes()
+            assert set(s_page.Resources.Font.keys()) == set(
+                p_page.Resources.Font.keys()
+            )
+            assert (
+                s_page.Resources.XObject.Fm1.read_bytes()
+                == p_page.Resources.XObject.Fm1.read_bytes()
+            )
+
+
+def test_process_pdf_can_overwrite_input(tmp_path, replacement_config_data):
+    """The input is read into memory up front, so it may double as the output."""
+    pdf_path = tmp_path / "in_place.pdf"
+    _make_input_pdf(pdf_path, b"BT /F1 10 Tf (A) Tj ET")
+
+    rule = replacement_config_data["rules"][0]
+    rule["target_font_file"] = str(get_cached_font(tmp_path))
+    config = ReplacementConfig(**replacement_config_data)
+
+    process_pdf(pdf_path, pdf_path, config)
+
+    with pikepdf.open(pdf_path) as out_pdf:
+        assert "/F_New" in out_pdf.pages[0].Resources.Font
+
+
+def test_rules_for_unused_fonts_are_not_embedded(tmp_path, replacement_config_data):
+    """Only rules whose source font appears in the document embed a target font."""
+    input_pdf_path = tmp_path / "input.pdf"
+    output_pdf_path = tmp_path / "output.pdf"
+
+    _make_input_pdf(
+        input_pdf_path,
+        b"BT /F1 10 Tf (A) Tj ET /Fm1 Do",
+        forms={"/Fm1": (b"BT /F2 12 Tf (A) Tj ET", "/F2")},
+    )
+
+    font_file = str(get_cached_font(tmp_path))
+    used = dict(replacement_config_data["rules"][0])
+    used["target_font_file"] = font_file
+    nested = dict(used, source_font_name="/F2", target_font_name="/F_Nested")
+    # Never loaded: a missing target file would fail if this rule were kept
+    unused = dict(
+        used,
+        source_font_name="/F9",
+        target_font_name="/F_Unused",
+        target_font_file=str(tmp_path / "missing.ttf"),
+    )
+    config = ReplacementConfig(rules=[used, nested, unused])
+
+    process_pdf(input_pdf_path, output_pdf_path, config)
+
+    with pikepdf.open(output_pdf_path) as out_pdf:
+        fonts = out_pdf.pages[0].Resources.Font
+        assert "/F_New" in fonts
+        assert "/F_Nested" in fonts
+        assert "/F_Unused" not in fonts
+
+
+def test_fast_save_writes_object_streams(tmp_path, replacement_config_data):
+    """fast_save packs objects into object streams; the result stays readable."""
+    input_pdf_path = tmp_path / "input.pdf"
+    _make_input_pdf(input_pdf_path, b"BT /F1 10 Tf (A) Tj ET")
+
+    rule = replacement_config_data["rules"][0]
+    rule["target_font_file"] = str(get_cached_font(tmp_path))
+    config = ReplacementConfig(**replacement_config_data)
+
+    output_pdf_path = tmp_path / "output.pdf"
+    process_pdf(input_pdf_path, output_pdf_path, config, fast_save=True)
+
+    assert b"/ObjStm" in output_pdf_path.read_bytes()
+    with pikepdf.open(output_pdf_path) as out_pdf:
+        assert "/F_New" in out_pdf.pages[0].Resources.Font
@@ -75,3 +75,21 @@ def test_calculate_source_width_tj_complex(engine):
     # Spacing: -(100/1000) * 10 = -1.0
     # Total: 9.0
     assert width == pytest.approx(9.0)
+
+
+def test_source_width_table_uses_missing_width_out_of_range(engine):
+    """Bytes outside FirstChar..LastChar or past /Widths use MissingWidth."""
+    engine.source_pikepdf_fonts = {
+        "/MockFont": {
+            "/Widths": [100, 200],
+            "/FirstChar": 65,
+            "/LastChar": 67,
+            "/FontDescriptor": {"/MissingWidth": 50},
+        }
+    }
+
+    metrics = engine._get_source_font_metrics()
+    # A, B from /Widths; C is in range but past the array; D is out of range
+    assert engine._compute_source_string_width(b"ABCD", metrics) == (400.0, 4)
+    # Same font object -> cached metrics are reused
+    assert engine._get_source_font_metrics() is metrics
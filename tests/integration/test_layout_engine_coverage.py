@@ -1,10 +1,11 @@
+from decimal import Decimal
 from unittest.mock import MagicMock
 
 import pytest
 from pdfbeaver.utils import extract_string_bytes
 
-from swapfont.engines.layout_engine import LayoutEngine
-from swapfont.models import ReplacementConfig
+from swapfont.engines.layout_engine import LayoutEngine, OperandWorkspace
+from swapfont.models import ReplacementConfig, ReplacementRule
 
 
 @pytest.fixture
@@ -14,7 +15,7 @@ def coverage_engine():
         config=config,
         target_font_cache={},
         custom_encoding_maps={},
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
 
@@ -77,6 +78,55 @@ def test_target_width_calculation_logic(coverage_engine):
     assert width == 12.0
 
 
+def test_target_width_lookups_are_memoized(coverage_engine):
+    """Each distinct byte hits the wrapper once until the font size changes."""
+    mock_wrapper = MagicMock()
+    mock_wrapper.get_char_width.return_value = 500
+    coverage_engine.active_wrapper = mock_wrapper
+    coverage_engine.active_font_size = 10.0
+
+    assert coverage_engine.calculate_target_visual_width("Tj", ["ABBA"]) == 20.0
+    assert coverage_engine.calculate_target_visual_width("Tj", ["BAAB"]) == 20.0
+    assert mock_wrapper.get_char_width.call_count == 2
+
+    coverage_engine.active_font_size = 20.0
+    assert coverage_engine.calculate_target_visual_width("Tj", ["AB"]) == 20.0
+    assert mock_wrapper.get_char_width.call_count == 4
+
+
+def test_tj_target_width_matches_per_item_sum(coverage_engine):
+    """Fusing the TJ strings into one lookup gives the per-item total."""
+    mock_wrapper = MagicMock()
+    mock_wrapper.get_char_width.side_effect = lambda ch: 100 * (ord(ch) - 64)
+    coverage_engine.active_wrapper = mock_wrapper
+    coverage_engine.active_font_size = 10.0
+
+    pieces = [
+        coverage_engine.calculate_target_visual_width("Tj", [s]) for s in ["AB", "C"]
+    ]
+    fused = coverage_engine.calculate_target_visual_width("TJ", [["AB", -250, "C"]])
+    assert fused == pytest.approx(sum(pieces) + 2.5)
+
+
+def test_repeated_string_width_is_remembered_per_font_size(coverage_engine):
+    """A repeated string is measured once until the font state changes."""
+    mock_wrapper = MagicMock()
+    mock_wrapper.get_char_width.return_value = 500.0
+    coverage_engine.active_wrapper = mock_wrapper
+    coverage_engine.active_font_size = 10.0
+
+    first = coverage_engine.calculate_target_visual_width("Tj", [b"12.50"])
+    lut_before = coverage_engine._target_width_lut.copy()
+    coverage_engine._target_width_lut[:] = 0.0  # a recomputation would give 0
+    assert coverage_engine.calculate_target_visual_width("Tj", [b"12.50"]) == first
+    coverage_engine._target_width_lut[:] = lut_before
+
+    coverage_engine.active_font_size = 20.0
+    assert coverage_engine.calculate_target_visual_width(
+        "Tj", [b"12.50"]
+    ) == pytest.approx(2 * first)
+
+
 def test_rewrite_operands_extra_args(coverage_engine):
     """Cover lines 305-306: Operators with multiple arguments (like quotes)."""
     # Setup active rule to allow rewriting logic to proceed
@@ -114,3 +164,120 @@ def test_map_source_byte_value_error(coverage_engine):
     # Should catch ValueError and return None
     assert target is None
     assert original == 0x110000
+
+
+def test_rewrite_bytes_translate_table_matches_byte_map(coverage_engine):
+    """The translation table reproduces _map_source_byte for every byte value."""
+    coverage_engine.active_rule = MagicMock()
+    coverage_engine.active_target_slot_map = {"A": 10, "ﬁ": 200}
+    coverage_engine.active_source_hex_map = {0x0C: "ﬁ"}
+
+    source = bytes(range(256))
+    expected = bytes(
+        slot if slot is not None else b
+        for b in source
+        for slot in [coverage_engine._map_source_byte(b)[0]]
+    )
+    assert coverage_engine._rewrite_bytes(source) == expected
+
+    # Slots that are not single bytes cannot go through the table
+    coverage_engine.active_target_slot_map = {"A": -1}
+    assert coverage_engine._get_translate_table() is None
+
+
+def test_operand_workspace_round_trip(coverage_engine):
+    """Strings are decoded once; rewriting keeps kerning and trailing operands."""
+    ws = OperandWorkspace.from_operands("TJ", [[b"AB", -120, "C"]])
+    assert ws.items == [b"AB", -120, b"C"]
+    assert ws.kinds == bytearray([1, 0, 1])
+    assert ws.numeric_vals == [-120.0]
+    assert ws.scale_gaps(0.5).items == [b"AB", -60.0, b"C"]
+
+    coverage_engine.active_rule = MagicMock()
+    coverage_engine.active_target_slot_map = {"A": 10, "C": 12}
+    rewritten = coverage_engine.rewrite_workspace(ws)
+
+    assert ws.items == [b"AB", -120, b"C"]
+    assert [bytes(x) if x != -120 else x for x in rewritten.to_operands()[0]] == [
+        b"\x0aB",
+        -120,
+        b"\x0c",
+    ]
+
+    quote = OperandWorkspace.from_operands('"', [b"A", 1, 2])
+    out = coverage_engine.rewrite_workspace(quote).to_operands()
+    assert bytes(out[0]) == b"\x0a"
+    assert out[1:] == [1, 2]
+
+
+def test_scale_gaps_scales_only_numeric_items():
+    """Gap scaling multiplies the kerning values and keeps the strings."""
+    items = [b"A", Decimal("-12.5"), b"B", 40, b"C", 1.5]
+    ws = OperandWorkspace("TJ", items)
+
+    assert ws.scale_gaps(0.8).items[::2] == [b"A", b"B", b"C"]
+    assert ws.scale_gaps(0.8).numeric_vals == pytest.approx([-10.0, 32.0, 1.2])
+
+
+def test_rebind_page_fonts_clears_page_state(coverage_engine):
+    """Rebinding swaps the page fonts and drops the active font, not the LUTs."""
+    coverage_engine.active_wrapper = MagicMock()
+    coverage_engine.active_wrapper.get_char_width.return_value = 500
+    coverage_engine.active_font_size = 10.0
+    coverage_engine.calculate_target_visual_width("Tj", ["A"])
+    lut = coverage_engine._target_width_lut
+    coverage_engine._source_metrics_cache["/F1"] = (object(), ())
+
+    page_fonts = {"/F2": MagicMock()}
+    coverage_engine.rebind_page_fonts(page_fonts)
+
+    assert coverage_engine.source_pikepdf_fonts is page_fonts
+    assert coverage_engine.active_wrapper is None
+    assert coverage_engine.active_rule is None
+    assert coverage_engine._source_metrics_cache == {}
+    assert coverage_engine._target_width_lut is lut
+
+
+def test_set_active_font_prefers_first_matching_rule(coverage_engine):
+    """The rule lookup table keeps the first rule per source font."""
+    first = ReplacementRule(source_font_name="/F1", target_font_file="a.ttf")
+    second = ReplacementRule(source_font_name="F1", target_font_file="b.ttf")
+    coverage_engine.config.rules = [first, second]
+
+    coverage_engine.set_active_font("/F1", 10.0)
+    assert coverage_engine.active_rule is first
+
+    coverage_engine.config.rules = [second]
+    coverage_engine.set_active_font("/F1", 10.0)
+    assert coverage_engine.active_rule is second
+
+
+def test_reselecting_rule_reuses_encoding_maps(coverage_engine, mocker):
+    """Switching back to a font only rescales; its maps are built once."""
+    rule = ReplacementRule(
+        source_font_name="/F1",
+        target_font_file="a.ttf",
+        encoding_map={"0x41": "B"},
+    )
+    other = ReplacementRule(source_font_name="/F2", target_font_file="a.ttf")
+    coverage_engine.config.rules = [rule, other]
+    build = mocker.spy(coverage_engine, "_initialize_encoding_maps")
+
+    coverage_engine.set_active_font("/F1", 10.0)
+    slot_map = coverage_engine.active_target_slot_map
+    coverage_engine.set_active_font("/F2", 12.0)
+    coverage_engine.set_active_font("/F1", 20.0)
+
+    assert build.call_count == 2
+    assert coverage_engine.active_target_slot_map is slot_map
+    assert coverage_engine.active_source_hex_map == {0x41: "B"}
+    assert coverage_engine.active_font_size == 20.0
+
+
+def test_font_name_normalization_is_memoized(coverage_engine):
+    """Tf operands are split once per distinct name; unhashable ones still work."""
+    assert coverage_engine._normalize_font_name("/F1") == ("/F1", "F1", "/F1")
+    assert "/F1" in coverage_engine._font_name_cache
+
+    unhashable = ["/F2"]
+    assert coverage_engine._normalize_font_name(unhashable)[1] == "['F2']"
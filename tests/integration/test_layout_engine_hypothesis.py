@@ -53,7 +53,7 @@ def empty_engine():
         config=config,
         target_font_cache={},
         custom_encoding_maps={},
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
 
@@ -95,7 +95,7 @@ def test_rewrite_operands_passthrough(operands):
         config=config,
         target_font_cache={},
         custom_encoding_maps={},
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
 
@@ -131,7 +131,7 @@ def test_set_active_font_map_inversion(empty_engine):
         config=config,
         target_font_cache={"Target.ttf": MagicMock()},  # Mock wrapper
         custom_encoding_maps={"Target.ttf": encoding_map_1},
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
 
@@ -160,12 +160,8 @@ def test_type3_scaling_logic(empty_engine):
     )
     empty_engine.config.rules = [rule]
 
-    # Setup Source Cache with Type 3 data
-    mock_source_data = MagicMock()
-    mock_source_data.is_type3 = True
-    mock_source_data.type3_design_height = 0.5  # Scale factor
-
-    empty_engine.source_font_cache = {"/T3": mock_source_data}
+    # Source Type 3 design height (scale factor)
+    empty_engine.source_type3_scales = {"/T3": 0.5}
 
     # Act
     font_name, font_size = empty_engine.set_active_font("/T3", 10.0)
@@ -239,7 +235,7 @@ def test_rewrite_text_operands_logic():
         ReplacementConfig(rules=[rule]),
         target_font_cache={"T.ttf": MagicMock()},
         custom_encoding_maps={"T.ttf": map_dict},
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
 
@@ -49,3 +49,40 @@ def test_layout_scaling_invariant(source_width, target_width):
     effective_width = target_width * (scale / 100.0)
     # Use loose tolerance because of float precision and engine internals
     assert math.isclose(effective_width, source_width, rel_tol=0.01)
+
+
+def test_zero_target_width_skips_source_measurement():
+    """With nothing to fit, the source fallback is never consulted."""
+    config = ReplacementConfig(rules=[])
+    _, layout_engine = build_test_editor([], config=config)
+
+    layout_engine.calculate_target_visual_width = MagicMock(return_value=0.0)
+    layout_engine.calculate_source_width_fallback = MagicMock(return_value=100.0)
+
+    scale = calculate_scale_percent(
+        "Tj", [b"abc"], [b"abc"], {}, np.array([0.0, 0.0, 1.0]), layout_engine
+    )
+
+    assert scale == 100.0
+    layout_engine.calculate_source_width_fallback.assert_not_called()
+
+
+def test_scale_percent_measures_distance_from_tuple_start(monkeypatch):
+    """The start position may be a plain tuple rather than an ndarray."""
+    config = ReplacementConfig(rules=[])
+    _, layout_engine = build_test_editor([], config=config)
+
+    layout_engine.calculate_target_visual_width = MagicMock(return_value=50.0)
+    layout_engine.calculate_source_width_fallback = MagicMock(return_value=0.0)
+    monkeypatch.setattr(
+        "swapfont.handlers.extract_text_position",
+        lambda state: np.array([33.0, 44.0, 1.0]),
+    )
+
+    scale = calculate_scale_percent(
+        "Tj", [b"abc"], [b"abc"], {}, (3.0, 4.0, 1.0), layout_engine
+    )
+
+    # hypot(30, 40) == 50 matches the target width exactly
+    assert scale == 100.0
+    layout_engine.calculate_source_width_fallback.assert_not_called()
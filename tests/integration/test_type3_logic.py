@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock
 
+from swapfont import models
 from swapfont.models import FontData
 
 from ..conftest import create_mock_stream
@@ -21,7 +22,7 @@ class TestType3Parsing:
         """
         # Setup Mock CharProcs
         mock_char_procs = MagicMock(spec=dict)
-        mock_char_procs.keys.return_value = ["/G1"]
+        mock_char_procs.__iter__.return_value = iter(["/G1"])
         mock_char_procs.__getitem__.side_effect = lambda k: create_mock_stream(
             "38 0 5 0 36 20 d1 0.01 cm", temp_pdf_doc
         )
@@ -50,7 +51,7 @@ class TestType3Parsing:
         """
         mock_char_procs = MagicMock(spec=dict)
         # We pretend we have 2 glyphs
-        mock_char_procs.keys.return_value = ["/m", "/p"]
+        mock_char_procs.__iter__.return_value = iter(["/m", "/p"])
 
         streams = {
             "/m": create_mock_stream("10 0 0 0 10 20 d1", temp_pdf_doc),  # 0 to 20
@@ -71,7 +72,7 @@ class TestType3Parsing:
         Ensures the parser doesn't crash on garbage binary data.
         """
         mock_char_procs = MagicMock(spec=dict)
-        mock_char_procs.keys.return_value = ["/Bad"]
+        mock_char_procs.__iter__.return_value = iter(["/Bad"])
         # Random binary bytes that might decode to weird chars, but no 'd1'
         mock_char_procs.__getitem__.return_value = create_mock_stream(
             "ÿØÿà\x00\x10JFIF", temp_pdf_doc
@@ -92,7 +93,7 @@ class TestType3Parsing:
         If 'd1' appears but without enough preceding numbers, ignore it.
         """
         mock_char_procs = MagicMock(spec=dict)
-        mock_char_procs.keys.return_value = ["/Broken"]
+        mock_char_procs.__iter__.return_value = iter(["/Broken"])
         # Only 2 args before d1 (needs 6)
         mock_char_procs.__getitem__.return_value = create_mock_stream(
             "10 20 d1", temp_pdf_doc
@@ -104,3 +105,31 @@ class TestType3Parsing:
         fd = FontData("/BrokenFont", font_dict)
         assert fd.type3_design_height == 0.0
         assert fd.type3_design_width == 0.0
+
+    def test_leading_d1_read_without_full_parse(self, temp_pdf_doc, monkeypatch):
+        """A glyph starting with d1 is measured without tokenizing it."""
+        mock_char_procs = MagicMock(spec=dict)
+        mock_char_procs.__iter__.return_value = iter(["/G1", "/G2"])
+        streams = {
+            "/G1": create_mock_stream(
+                "\n500 0 -.5 -10 40.5 +30 d1\n0 0 m f", temp_pdf_doc
+            ),
+            # Not six plain numbers: goes through the full parser
+            "/G2": create_mock_stream("% glyph\n500 0 0 -20 10 10 d1", temp_pdf_doc),
+        }
+        mock_char_procs.__getitem__.side_effect = lambda k: streams[k]
+        mock_char_procs.__len__.return_value = 2
+
+        parsed = []
+        real_parse = models.parse_content_stream
+        monkeypatch.setattr(
+            models,
+            "parse_content_stream",
+            lambda stream: parsed.append(stream) or real_parse(stream),
+        )
+
+        fd = FontData("/T3", {"/Subtype": "/Type3", "/CharProcs": mock_char_procs})
+
+        assert parsed == [streams["/G2"]]
+        assert fd.type3_design_height == 50.0  # -20 to 30
+        assert fd.type3_design_width == 41.0  # -0.5 to 40.5
@@ -1,7 +1,10 @@
 from unittest.mock import MagicMock
 
+import numpy as np
 from pikepdf import Name, Operator
 
+from swapfont.engines.layout_engine import LayoutEngine
+from swapfont.handlers import get_type3_matrix_ops
 from swapfont.models import ReplacementConfig, ReplacementRule
 
 from ..conftest import build_test_editor
@@ -90,3 +93,28 @@ def test_stream_editor_outputs_replaced_font_operands():
     # Verify interaction with LayoutEngine
     # Ensure the editor actually asked the engine for the correct font/size
     layout_engine.set_active_font.assert_called_once_with(Name("/Type3Source"), 10.0)
+
+
+def test_type3_matrix_ops_are_reused_while_matrices_are_unchanged():
+    """Consecutive text-shows under the same Tm and CTM share one result."""
+    engine = LayoutEngine(ReplacementConfig(rules=[]), {}, {}, {}, {})
+    engine.current_type3_scale_factor = 0.5
+
+    tracker = MagicMock()
+    tracker.textstate.matrix = [1.0, 0.0, 0.0, -1.0, 10.0, 20.0]
+    tracker.gstate.ctm = [1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+    tracker.get_matrices.return_value = (None, np.diag([1.0, -1.0, 1.0]))
+
+    first = get_type3_matrix_ops(tracker, engine)
+    second = get_type3_matrix_ops(tracker, engine)
+
+    assert first == second
+    assert first[0] is True
+    assert first[1]["apply"][0] == [1.0, 0.0, 0.0, 1.0, 10.0, 20.0]
+    assert tracker.get_matrices.call_count == 1
+
+    # A new text matrix invalidates the memo
+    tracker.textstate.matrix = [1.0, 0.0, 0.0, -1.0, 30.0, 20.0]
+    third = get_type3_matrix_ops(tracker, engine)
+    assert third[1]["restore"][0] == [1.0, 0.0, 0.0, -1.0, 30.0, 20.0]
+    assert tracker.get_matrices.call_count == 2
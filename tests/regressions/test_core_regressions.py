@@ -206,7 +206,7 @@ def test_regression_width_calculation_methodology():
         config=config,
         target_font_cache={},
         custom_encoding_maps={},
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
     editor.layout_engine = layout_engine
@@ -3,7 +3,7 @@ import logging
 import pikepdf
 from pikepdf import Dictionary
 
-from swapfont.core import _update_page_resources
+from swapfont.core import _add_font_resources, _target_font_resources
 
 # Import modules to test
 from swapfont.models import (
@@ -31,7 +31,7 @@ def test_resolve_unicode_name_fuzzy_branches(caplog):
 
 
 # --- 2. Core: Defensive Resource Creation ---
-def test_update_page_resources_creates_missing_dicts():
+def test_add_font_resources_creates_missing_dicts():
     """
     Covers lines 206-217 in core.py: Creating missing /Resources and /Font dicts.
     """
@@ -52,7 +52,7 @@ def test_update_page_resources_creates_missing_dicts():
     embedded_objs = {"dummy.ttf": Dictionary()}
 
     # Execute
-    _update_page_resources(page, config, embedded_objs)
+    _add_font_resources(page, _target_font_resources(config, embedded_objs))
 
     # Assert
     assert "/Resources" in page
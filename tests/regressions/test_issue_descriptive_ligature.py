@@ -37,7 +37,7 @@ def test_descriptive_ligature_resolution():
         config=config,
         target_font_cache={"Target.ttf": MagicMock()},
         custom_encoding_maps=target_map,
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
 
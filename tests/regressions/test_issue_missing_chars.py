@@ -28,7 +28,7 @@ def test_repro_rule_encoding_map_ignored():
         config=config,
         target_font_cache={"Target.ttf": MagicMock()},
         custom_encoding_maps={},
-        source_font_cache={},
+        source_type3_scales={},
         source_pikepdf_fonts={},
     )
 
@@ -32,24 +32,17 @@ def test_type3_scale_factor_reset():
     )
     config = ReplacementConfig(rules=[rule_type3, rule_standard])
 
-    # 2. Mock Source Fonts
+    # 2. Source Type 3 scales
     # Type 3 Font: Defines a 50% scaling factor
-    mock_t3_source = MagicMock()
-    mock_t3_source.is_type3 = True
-    mock_t3_source.type3_design_height = 0.5
-
-    # Standard Font: Normal Type 1/TrueType (No special attributes)
-    mock_std_source = MagicMock()
-    mock_std_source.is_type3 = False
-
-    source_cache = {"/Type3Font": mock_t3_source, "/StandardFont": mock_std_source}
+    # Standard Font: Normal Type 1/TrueType, so it has no entry
+    source_type3_scales = {"/Type3Font": 0.5}
 
     # 3. Initialize Engine
     engine = LayoutEngine(
         config=config,
         target_font_cache={"Target.ttf": MagicMock()},
         custom_encoding_maps={},
-        source_font_cache=source_cache,
+        source_type3_scales=source_type3_scales,
         source_pikepdf_fonts={},
     )
 